@@ -4,9 +4,19 @@ import os
 LLM_MODEL_NAME = "google/flan-t5-base"
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 
+# Compile the embedder forward pass with torch.compile (slow first call, faster afterwards)
+COMPILE_EMBEDDER = os.getenv("COMPILE_EMBEDDER", "0") == "1"
+
+# On CUDA, generate with a static KV cache + torch.compile so decoding replays CUDA graphs
+STATIC_GENERATION = os.getenv("STATIC_GENERATION", "0") == "1"
+
+# On CPU-only machines, embed with an int8-quantized ONNX export (needs optimum[onnxruntime])
+ONNX_INT8_EMBEDDER = os.getenv("ONNX_INT8_EMBEDDER", "0") == "1"
+
 # Paths
 DOCS_DIRECTORY = os.path.join(os.getcwd(), "data")
-CHROMA_PERSIST_DIRECTORY = os.path.join(os.getcwd(), "chroma_db")
+INDEX_PERSIST_DIRECTORY = os.path.join(os.getcwd(), "faiss_index")
+ONNX_MODEL_DIRECTORY = os.path.join(os.getcwd(), "onnx_models")
 
 # Routing Keywords
-SEARCH_KEYWORDS = ["pdf", "document", "data", "summarize", "information", "find", "context", "file"]
+SEARCH_KEYWORDS = frozenset({"pdf", "document", "data", "summarize", "information", "find", "context", "file"})
@@ -1,11 +1,18 @@
+import re
+
 from src.config import SEARCH_KEYWORDS
 
+_WORD_RE = re.compile(r"[a-z]+")
+
 def agent_controller(query: str) -> str:
     """
     Decides whether to 'search' the knowledge base or answer 'direct'.
     Uses keyword-based routing to identify intent.
     """
-    q_lower = query.lower()
-    if any(word in q_lower for word in SEARCH_KEYWORDS):
+    # Whole-word set intersection: keywords inside other words ("helpdfine")
+    # don't match, while simple plurals ("documents", "pdfs") still do.
+    words = set(_WORD_RE.findall(query.lower()))
+    words.update([w[:-1] for w in words if w.endswith("s")])
+    if not SEARCH_KEYWORDS.isdisjoint(words):
         return "search"
     return "direct"
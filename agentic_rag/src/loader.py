@@ -1,34 +1,69 @@
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from src.config import DOCS_DIRECTORY
 
-def load_and_split_docs(folder_path=DOCS_DIRECTORY):
-    """Loads PDFs from a folder and splits them into chunks."""
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-        print(f"📁 Created directory: {folder_path}")
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 80
+
+def _load_one(file_path):
+    """Loads a single PDF. Top-level so it can be pickled into a worker process."""
+    file = os.path.basename(file_path)
+    print(f"📄 Loading: {file}")
+    try:
+        return PyPDFLoader(file_path).load()
+    except Exception as e:
+        print(f"❌ Error loading {file}: {e}")
         return []
 
-    docs = []
-    for file in os.listdir(folder_path):
-        if file.endswith(".pdf"):
-            file_path = os.path.join(folder_path, file)
-            print(f"📄 Loading: {file}")
-            try:
-                loader = PyPDFLoader(file_path)
-                docs.extend(loader.load())
-            except Exception as e:
-                print(f"❌ Error loading {file}: {e}")
-    
+def _load_and_split_one(file_path):
+    """Loads and chunks a single PDF inside a worker, so only its chunks come back."""
+    docs = _load_one(file_path)
     if not docs:
         return []
-
-    # Chunking
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=80
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
     )
-    chunks = text_splitter.split_documents(docs)
-    print(f"✂️ Created {len(chunks)} chunks.")
+    return text_splitter.split_documents(docs)
+
+def list_pdfs(folder_path=DOCS_DIRECTORY):
+    """Returns the PDF paths in a folder, creating the folder if it is missing."""
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+        print(f"📁 Created directory: {folder_path}")
+        return []
+    # scandir yields DirEntry objects with cached type info, so subdirectories
+    # are skipped without an extra stat call per entry
+    with os.scandir(folder_path) as it:
+        return [e.path for e in it if e.name.endswith(".pdf") and e.is_file(follow_symlinks=False)]
+
+def iter_chunks(paths):
+    """
+    Yields chunks PDF by PDF, in order. PDFs are parsed and split across a process
+    pool, but at most 2x the worker count are in flight, so peak memory is bounded
+    by a handful of PDFs rather than the whole corpus.
+    """
+    if not paths:
+        return
+    workers = min(len(paths), os.cpu_count() or 1)
+    # The caller may already have loaded torch/tokenizers (and their thread pools)
+    # before the first chunk is pulled, so workers are spawned rather than forked
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        pending = deque()
+        for path in paths:
+            pending.append(ex.submit(_load_and_split_one, path))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def load_and_split_docs(folder_path=DOCS_DIRECTORY):
+    """Loads PDFs from a folder and splits them into chunks."""
+    chunks = list(iter_chunks(list_pdfs(folder_path)))
+    if chunks:
+        print(f"✂️ Created {len(chunks)} chunks.")
     return chunks
@@ -5,21 +5,21 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import DOCS_DIRECTORY
-from src.loader import load_and_split_docs
+from src.loader import list_pdfs, iter_chunks
 from src.pipeline import setup_retriever, rag_answer
 
 def main():
     print("=" * 50)
-    print("  Agentic RAG Pipeline (Flan-T5 + Chroma)")
+    print("  Agentic RAG Pipeline (Flan-T5 + FAISS)")
     print("=" * 50)
 
     # Step 1: Data Ingestion
-    chunks = load_and_split_docs(DOCS_DIRECTORY)
-    if not chunks:
+    pdf_paths = list_pdfs(DOCS_DIRECTORY)
+    if not pdf_paths:
         print(f"⚠️ No PDF documents found in {DOCS_DIRECTORY}. System will only answer directly.")
     
-    # Step 2: Setup Retriever
-    retriever = setup_retriever(chunks)
+    # Step 2: Setup Retriever (chunks stream from the loader straight into the index)
+    retriever = setup_retriever(iter_chunks(pdf_paths))
 
     # Step 3: Interactive Chat Loop
     print("\n🚀 Ready! The Agent is watching your queries.")
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+class OnnxInt8Embeddings(Embeddings):
+    """
+    Sentence embeddings from a dynamically int8-quantized ONNX export of the model.
+    Meant for CPU-only machines, where int8 matmuls roughly double throughput.
+    The export and quantization run once and are cached under `cache_dir`.
+    Requires `optimum[onnxruntime]`.
+    """
+
+    def __init__(self, model_name, cache_dir, batch_size=64, max_length=256):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        quantized_dir = os.path.join(cache_dir, "int8")
+
+        if not os.path.isdir(quantized_dir):
+            print(f"⚙️ Exporting {hub_name} to int8 ONNX (one-time)...")
+            export_dir = os.path.join(cache_dir, "fp32")
+            ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True).save_pretrained(export_dir)
+            ORTQuantizer.from_pretrained(export_dir).quantize(
+                save_dir=quantized_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            quantized_dir, file_name="model_quantized.onnx"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(hub_name)
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def _encode(self, texts):
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(
+                texts[i:i + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            hidden = np.asarray(self.model(**inputs).last_hidden_state)
+            # Mean pooling over real tokens, then L2-normalise (matches sentence-transformers)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.append(pooled.astype(np.float32))
+        return np.concatenate(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def embed_documents(self, texts):
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
@@ -1,56 +1,186 @@
-from transformers import pipeline
-from langchain_chroma import Chroma
+import hashlib
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, GenerationConfig, T5ForConditionalGeneration
 from langchain_huggingface import HuggingFaceEmbeddings
-from src.config import LLM_MODEL_NAME, EMBEDDING_MODEL_NAME, CHROMA_PERSIST_DIRECTORY
+from src.config import (
+    LLM_MODEL_NAME, EMBEDDING_MODEL_NAME, INDEX_PERSIST_DIRECTORY, ONNX_MODEL_DIRECTORY,
+    COMPILE_EMBEDDER, ONNX_INT8_EMBEDDER, STATIC_GENERATION
+)
 from src.controller import agent_controller
+from src.vector_store import FaissStore
+
+BATCH_SIZE = 512
+EMBEDDING_BATCH_SIZE = 256
+MAX_INPUT_TOKENS = 512
+MAX_NEW_TOKENS = 150
+# Prompts are padded up to a multiple of this, bounding the number of distinct input shapes
+PAD_TO_MULTIPLE = 64
+
+# Answer caches: exact (action, query) LRU + semantic ring buffer of recent search queries
+QUERY_CACHE_SIZE = 1024
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.97
 
 # Global instances (simplified for local execution)
 _llm = None
 _retriever = None
+_embedding_model = None
+_query_cache = OrderedDict()
+_qvecs = None
+_qans = [None] * SEMANTIC_CACHE_SIZE
+_qpos = 0
 
 def get_llm():
+    """Returns the (tokenizer, model, generation_config) triple, loading it once."""
     global _llm
     if _llm is None:
         print(f"🧠 Loading LLM: {LLM_MODEL_NAME}...")
-        _llm = pipeline(
-            "text2text-generation",
-            model=LLM_MODEL_NAME,
-            max_new_tokens=150
-        )
+        tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL_NAME)
+        model = T5ForConditionalGeneration.from_pretrained(LLM_MODEL_NAME)
+        if torch.cuda.is_available():
+            # T5 overflows in fp16; bf16 keeps the fp32 exponent range
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float32
+            model = model.to(device="cuda", dtype=dtype)
+        model.eval()
+
+        generation_config = GenerationConfig(max_new_tokens=MAX_NEW_TOKENS, do_sample=False)
+        if STATIC_GENERATION and torch.cuda.is_available():
+            # Fixed-size KV cache + bucketed prompt lengths give static shapes,
+            # so the compiled decoder step is captured once and replayed as a CUDA graph
+            generation_config.cache_implementation = "static"
+            model.forward = torch.compile(model.forward, mode="reduce-overhead")
+        _llm = (tokenizer, model, generation_config)
     return _llm
 
+def generate(prompt):
+    """Runs Flan-T5 generation for a single prompt."""
+    tokenizer, model, generation_config = get_llm()
+    inputs = tokenizer(
+        prompt,
+        return_tensors="pt",
+        padding=True,
+        pad_to_multiple_of=PAD_TO_MULTIPLE,
+        truncation=True,
+        max_length=MAX_INPUT_TOKENS
+    ).to(model.device)
+    with torch.inference_mode():
+        output_ids = model.generate(**inputs, generation_config=generation_config)
+    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        on_gpu = torch.cuda.is_available()
+        if ONNX_INT8_EMBEDDER and not on_gpu:
+            from src.onnx_embeddings import OnnxInt8Embeddings
+            _embedding_model = OnnxInt8Embeddings(EMBEDDING_MODEL_NAME, ONNX_MODEL_DIRECTORY)
+            return _embedding_model
+
+        # Encode on GPU in fp16 with large batches when available.
+        # SentenceTransformer already length-sorts each encode call to minimise padding.
+        model_kwargs = {"device": "cuda" if on_gpu else "cpu"}
+        if on_gpu:
+            model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
+        _embedding_model = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
+            model_kwargs=model_kwargs,
+            encode_kwargs={
+                "batch_size": EMBEDDING_BATCH_SIZE if on_gpu else 32,
+                "normalize_embeddings": True,
+                "convert_to_numpy": True,
+            }
+        )
+        if COMPILE_EMBEDDER:
+            # Fuse the transformer kernels; dynamic shapes avoid a recompile per batch length
+            transformer = _embedding_model._client[0]
+            transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+    return _embedding_model
+
 def setup_retriever(chunks):
-    """Sets up the vector store and retriever."""
+    """Sets up the vector store and retriever from any iterable of chunks."""
     global _retriever
-    embedding_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    embedding_model = get_embedding_model()
     
     print("📦 Initializing Vector Store...")
-    db = Chroma(
-        collection_name="rag_store",
-        embedding_function=embedding_model,
-        persist_directory=CHROMA_PERSIST_DIRECTORY
-    )
+    db = FaissStore(embedding_model, INDEX_PERSIST_DIRECTORY)
     
-    if chunks:
-        texts = [c.page_content for c in chunks]
-        db.add_texts(texts)
+    # Consume chunks as they are produced, embedding and inserting in fixed-size
+    # batches; chunks already in the persisted index are skipped by content hash
+    chunk_iter = iter(chunks)
+    total = added = 0
+    while True:
+        batch = [c.page_content for c in itertools.islice(chunk_iter, BATCH_SIZE)]
+        if not batch:
+            break
+        total += len(batch)
+        added += db.add_texts(batch)
+    if added:
+        db.save()
+    if total:
+        print(f"🧮 Embedded {added} new chunks ({total - added} already indexed).")
     
-    _retriever = db.as_retriever(search_kwargs={"k": 3})
+    _retriever = db.as_retriever(k=3)
     return _retriever
 
+def _cache_key(action, query):
+    return hashlib.blake2b(f"{action}\0{query}".encode()).hexdigest()
+
+def _semantic_lookup(qvec, action):
+    """Returns a cached answer for a near-duplicate query, if any."""
+    if _qvecs is None:
+        return None
+    # Embeddings are L2-normalised, so the dot product is the cosine similarity
+    sims = _qvecs @ qvec
+    best = int(np.argmax(sims))
+    if sims[best] >= SEMANTIC_CACHE_THRESHOLD and _qans[best][0] == action:
+        return _qans[best][1]
+    return None
+
+def _semantic_store(qvec, action, answer):
+    global _qvecs, _qpos
+    if _qvecs is None:
+        _qvecs = np.zeros((SEMANTIC_CACHE_SIZE, qvec.shape[0]), dtype=np.float32)
+    slot = _qpos % SEMANTIC_CACHE_SIZE
+    _qvecs[slot] = qvec
+    _qans[slot] = (action, answer)
+    _qpos += 1
+
 def rag_answer(query, retriever):
     """Execution loop with agentic routing."""
     action = agent_controller(query)
-    llm = get_llm()
 
+    key = _cache_key(action, query)
+    if key in _query_cache:
+        _query_cache.move_to_end(key)
+        return _query_cache[key]
+
+    qvec = None
     if action == "search":
+        # One embedding serves both the semantic cache and the index search
+        qvec = np.asarray(get_embedding_model().embed_query(query), dtype=np.float32)
+        cached = _semantic_lookup(qvec, action)
+        if cached is not None:
+            print(f"♻️ Reusing cached answer for a similar question: '{query}'")
+            return cached
+
         print(f"🕵️ Agent decided to SEARCH document for: '{query}'")
-        results = retriever.invoke(query)
+        results = retriever.invoke_by_vector(qvec)
         context = "\n".join([r.page_content for r in results])
         final_prompt = f"Use this context:\n{context}\n\nAnswer the question: {query}"
     else:
+        # Direct answers only use the exact cache, so they never pay for an embedding
         print(f"🤖 Agent decided to answer DIRECTLY: '{query}'")
         final_prompt = query
 
-    response = llm(final_prompt)[0]["generated_text"]
+    response = generate(final_prompt)
+
+    _query_cache[key] = response
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+    if qvec is not None:
+        _semantic_store(qvec, action, response)
     return response
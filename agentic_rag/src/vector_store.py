@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+class FaissStore:
+    """Exact inner-product FAISS index over normalised embeddings, persisted to disk."""
+
+    def __init__(self, embedding_model, persist_directory):
+        self.embedding_model = embedding_model
+        self.index_path = os.path.join(persist_directory, "index.faiss")
+        self.docstore_path = os.path.join(persist_directory, "docstore.json")
+        self.index = None
+        self.texts = []
+        self.ids = []
+
+        if os.path.exists(self.index_path) and os.path.exists(self.docstore_path):
+            self.index = faiss.read_index(self.index_path)
+            with open(self.docstore_path, encoding="utf-8") as f:
+                docstore = json.load(f)
+            self.texts = docstore["texts"]
+            self.ids = docstore["ids"]
+        self._id_set = set(self.ids)
+
+    def add_texts(self, texts):
+        """Embeds texts not already stored (by content hash) and appends them to the index."""
+        new_texts, new_ids, pending = [], [], set()
+        for text in texts:
+            h = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            if h not in self._id_set and h not in pending:
+                pending.add(h)
+                new_texts.append(text)
+                new_ids.append(h)
+        if not new_texts:
+            return 0
+
+        embs = np.asarray(self.embedding_model.embed_documents(new_texts), dtype="float32")
+        if self.index is None:
+            self.index = faiss.IndexFlatIP(embs.shape[1])
+        self.index.add(embs)
+        # Only marked as stored once indexed, so a failed embed can be retried
+        self._id_set.update(pending)
+        self.texts.extend(new_texts)
+        self.ids.extend(new_ids)
+        return len(new_texts)
+
+    def save(self):
+        if self.index is None:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        faiss.write_index(self.index, self.index_path)
+        with open(self.docstore_path, "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "texts": self.texts}, f)
+
+    def similarity_search_by_vector(self, qvec, k=3):
+        if self.index is None or self.index.ntotal == 0:
+            return []
+        qvec = np.asarray(qvec, dtype="float32").reshape(1, -1)
+        _, idx = self.index.search(qvec, min(k, self.index.ntotal))
+        return [Document(page_content=self.texts[i]) for i in idx[0] if i != -1]
+
+    def as_retriever(self, k=3):
+        return FaissRetriever(self, k)
+
+class FaissRetriever:
+    """Minimal retriever exposing the `.invoke(query)` interface used by the pipeline."""
+
+    def __init__(self, store, k=3):
+        self.store = store
+        self.k = k
+
+    def invoke(self, query):
+        qvec = self.store.embedding_model.embed_query(query)
+        return self.invoke_by_vector(qvec)
+
+    def invoke_by_vector(self, qvec):
+        """Searches with a query embedding the caller has already computed."""
+        return self.store.similarity_search_by_vector(qvec, self.k)
@@ -8,6 +8,8 @@ from src.controller import agent_controller
     ("hello world", "direct"),
     ("extract data from file", "search"),
     ("who are you?", "direct"),
+    ("Summarize these DOCUMENTS", "search"),
+    ("helpdfine this word", "direct"),
 ])
 def test_agent_controller_routing(query, expected):
     """Test if the controller routes correctly based on keywords."""
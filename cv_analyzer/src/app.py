@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import json
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from extractor import extract_text_from_pdf
 from cleaner import clean_cv_text_advanced
 from summarizer_llama import summarize_cv_llama
@@ -77,17 +78,22 @@ def main():
                 # Cleanup temp file
                 os.unlink(tmp_path)
 
-                # 3. Parallel Processing (Conceptual/Sequential here for simplicity)
-                # Generate Summary
-                summary = summarize_cv_llama(cleaned_text)
-                
-                # Extract JSON
-                cv_json = extract_cv_json_llama(cleaned_text + "\n\nSummary:\n" + summary)
-                
-                # Compute Skill Match
-                match_result = {}
-                if job_description.strip():
-                    match_result = compute_skill_match(cleaned_text, job_description)
+                # 3. Parallel Processing: the LLM calls are network-bound, so overlap them.
+                # Summary and skill match are independent; JSON extraction needs the summary.
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    summary_future = executor.submit(summarize_cv_llama, cleaned_text)
+                    match_future = None
+                    if job_description.strip():
+                        match_future = executor.submit(compute_skill_match, cleaned_text, job_description)
+
+                    # Generate Summary
+                    summary = summary_future.result()
+
+                    # Extract JSON (runs while the skill match may still be in flight)
+                    cv_json = extract_cv_json_llama(cleaned_text + "\n\nSummary:\n" + summary)
+
+                    # Compute Skill Match
+                    match_result = match_future.result() if match_future else {}
 
                 # --- Display Results ---
                 col1, col2 = st.columns([1, 1])
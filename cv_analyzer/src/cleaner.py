@@ -1,30 +1,21 @@
+import re
 from ftfy import fix_text
-from cleantext import clean
 from unidecode import unidecode
 
-def clean_cv_text_advanced(text: str) -> str:
+# Bullet glyphs (incl. the Symbol/Wingdings private-use bullets PDFs emit) -> dash.
+# Applied before unidecode, which would otherwise turn them into "*" or drop them.
+_BULLETS = str.maketrans({c: "-" for c in "\u2022\u25cf\u25aa\u25e6\u2023\u2043\uf0b7\uf0d7"})
 
-    #Fix encoding issues
-    text = fix_text(text)
+# Whitespace around line breaks (blank lines included) or runs of spaces/tabs
+_WHITESPACE_RE = re.compile(r"\s*[\n\r\v\f]\s*|[ \t]{2,}")
 
-    #Normalize Unicode to ASCII 
-    text = unidecode(text)
-    text = clean(
-        text,
-        fix_unicode=True,
-        to_ascii=True,
-        lower=False,
-        no_line_breaks=False,
-        no_urls=True,
-        no_emails=False,
-        no_numbers=False,
-        no_punct=False
-    )
+def _collapse_whitespace(match: re.Match) -> str:
+    return "\n" if match.group().strip(" \t") else " "
 
-    #Replace bullets with dash
-    text = text.replace("•", "-").replace("", "-")
+def clean_cv_text_advanced(text: str) -> str:
 
-    #Remove multiple blank lines
-    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    #Fix encoding issues, replace bullets, normalize Unicode to ASCII
+    text = unidecode(fix_text(text).translate(_BULLETS))
 
-    return text
+    #Trim lines and remove blank lines in a single pass
+    return _WHITESPACE_RE.sub(_collapse_whitespace, text).strip()
@@ -1,27 +1,20 @@
-from llm_client import query_llm
-import json
+from llm_client import query_llm, extract_json
+
+# Fixed instruction block sent first and byte-identical on every call, so
+# Ollama can reuse the KV cache for this prefix and only prefill the CV text.
+JSON_PROMPT_PREFIX = """Extract the following CV into JSON format.
+Keys: name, contact, email, linkedin, github, skills (list), experience (list of role, company, period, description), tools, summary
+Respond ONLY with valid JSON.
+CV Text:
+"""
 
 def extract_cv_json_llama(text: str) -> dict:
-    prompt = f"""
-    Extract the following CV into JSON format.
-    Keys: name, contact, email, linkedin, github, skills (list), experience (list of role, company, period, description), tools, summary
-    CV Text:
-    {text}
-    Respond ONLY with valid JSON.
-    """
+    prompt = JSON_PROMPT_PREFIX + text
     # Increase max_tokens for full JSON extraction
     response = query_llm(prompt, max_tokens=2048)
     
-    # Advanced JSON extraction: Find the first '{' and last '}'
-    import re
+    # Advanced JSON extraction: decode the first JSON value in the response
     try:
-        match = re.search(r'(\{.*\}|\[.*\])', response, re.DOTALL)
-        if match:
-            clean_response = match.group(1)
-            return json.loads(clean_response)
-        else:
-            return json.loads(response) # Try original as fallback
+        return extract_json(response)
     except Exception as e:
         return {"error": f"Failed to parse JSON: {e}", "raw_response": response}
-
-
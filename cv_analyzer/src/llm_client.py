@@ -1,10 +1,22 @@
 # src/llm_client.py
 
+import json
+import re
+
 import requests
+from requests.adapters import HTTPAdapter
 
 # Change this to the port where Ollama is actually running
 LLM_API_URL = "http://localhost:11434/api/generate"
 
+# How long Ollama keeps the model loaded after the last request
+LLM_KEEP_ALIVE = "30m"
+
+# Shared session so every call reuses a pooled keep-alive connection
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 def query_llm(prompt: str, max_tokens: int = 512, temperature: float = 0.3) -> str:
     """
     Send a prompt to the local Ollama API and get the response
@@ -13,13 +25,31 @@ def query_llm(prompt: str, max_tokens: int = 512, temperature: float = 0.3) -> s
         "model": "llama3:latest",
         "prompt": prompt,
         "stream": False,
+        "keep_alive": LLM_KEEP_ALIVE,
         "options": {
             "num_predict": max_tokens,
             "temperature": temperature
         }
     }
-    response = requests.post(LLM_API_URL, json=payload)
+    response = _SESSION.post(LLM_API_URL, json=payload)
     response.raise_for_status()
     data = response.json()
     return data.get('response', '')
 
+
+_JSON_START_RE = re.compile(r"[{\[]")
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_json(text: str):
+    """
+    Parse the first JSON object/array embedded in an LLM response.
+    Decodes in one linear pass from each opening brace instead of a
+    backtracking regex over the whole response.
+    """
+    for match in _JSON_START_RE.finditer(text):
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, match.start())
+            return obj
+        except json.JSONDecodeError:
+            continue
+    return json.loads(text)  # Try original as fallback (raises on failure)
@@ -4,6 +4,7 @@ from summarizer_llama import summarize_cv_llama
 from json_extractor_llama import extract_cv_json_llama
 from matcher_llama import compute_skill_match
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
 DATA_FOLDER = "./data"
@@ -25,28 +26,32 @@ def main():
     print("[*] Cleaning text...")
     cleaned_text = clean_cv_text_advanced(raw_text)
 
-    print("[*] Generating summary with LLaMA...")
-    # Summarize
-    summary = summarize_cv_llama(cleaned_text)
-
-    # Add summary before JSON extraction
-    cleaned_text_with_summary = cleaned_text + "\n\nSummary:\n" + summary
-
-    print("[*] Extracting structured JSON with LLaMA...")
-    # Extract structured JSON
-    cv_json = extract_cv_json_llama(cleaned_text_with_summary)
-
     # --- Skill Matching Feature ---
-    print("\n[*] --- Skill Matching Analysis ---")
     sample_jd = """
     We are looking for a Senior AI Engineer with experience in LLMs, RAG systems, and MLOps. 
     Required skills include Python, PyTorch, Docker, and experience with cloud platforms like AWS or GCP.
     Nice to have: Experience with agentic workflows and fine-tuning models.
     """
-    
-    print("[*] Comparing CV with Job Description...")
-    match_result = compute_skill_match(cleaned_text, sample_jd)
-    
+
+    # The LLM calls are network-bound: run the skill match alongside summary + JSON extraction
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        print("[*] Comparing CV with Job Description...")
+        match_future = executor.submit(compute_skill_match, cleaned_text, sample_jd)
+
+        print("[*] Generating summary with LLaMA...")
+        # Summarize
+        summary = summarize_cv_llama(cleaned_text)
+
+        # Add summary before JSON extraction
+        cleaned_text_with_summary = cleaned_text + "\n\nSummary:\n" + summary
+
+        print("[*] Extracting structured JSON with LLaMA...")
+        # Extract structured JSON
+        cv_json = extract_cv_json_llama(cleaned_text_with_summary)
+
+        match_result = match_future.result()
+
+    print("\n[*] --- Skill Matching Analysis ---")
     print("[*] Match Score:", match_result.get("match_score", "N/A"), "/ 100")
     print("[*] Matched Skills:", ", ".join(match_result.get("matched_skills", [])))
     print("[*] Missing Skills:", ", ".join(match_result.get("missing_skills", [])))
@@ -1,46 +1,41 @@
-from llm_client import query_llm
-import json
-import re
+from llm_client import query_llm, extract_json
 
-def compute_skill_match(cv_text: str, job_description: str) -> dict:
-    """
-    Compares CV text with a Job Description and returns a JSON report.
-    """
-    prompt = f"""
-    You are an expert recruiter AI assistant.
+# Fixed instruction block sent first and byte-identical on every call, so
+# Ollama can reuse the KV cache for this prefix and only prefill the CV/JD text.
+MATCH_PROMPT_PREFIX = """You are an expert recruiter AI assistant.
 
-    Task: Compare the candidate's CV with the following job description and compute a skill match score.
+Task: Compare the candidate's CV with the following job description and compute a skill match score.
 
-    Instructions:
-    1. Analyze the CV and extract the candidate’s key skills and tools.
-    2. Compare these skills with the job description.
-    3. Compute a matching score from 0 to 100.
-    4. Provide a summary of matched, missing, and extra skills.
+Instructions:
+1. Analyze the CV and extract the candidate’s key skills and tools.
+2. Compare these skills with the job description.
+3. Compute a matching score from 0 to 100.
+4. Provide a summary of matched, missing, and extra skills.
 
-    Output format (JSON):
-    {{
-      "match_score": <integer 0-100>,
-      "matched_skills": ["list of skills found in both CV and job description"],
-      "missing_skills": ["list of skills in job description but not in CV"],
-      "extra_skills": ["skills in CV not in job description"]
-    }}
+Output format (JSON):
+{
+  "match_score": <integer 0-100>,
+  "matched_skills": ["list of skills found in both CV and job description"],
+  "missing_skills": ["list of skills in job description but not in CV"],
+  "extra_skills": ["skills in CV not in job description"]
+}
 
-    Candidate CV: 
-    {cv_text}
+Respond ONLY with valid JSON.
 
-    Job Description:
-    {job_description}
+Candidate CV:
+"""
 
-    Respond ONLY with valid JSON.
+def compute_skill_match(cv_text: str, job_description: str) -> dict:
+    """
+    Compares CV text with a Job Description and returns a JSON report.
     """
+    prompt = MATCH_PROMPT_PREFIX + cv_text + "\n\nJob Description:\n" + job_description
     
     response = query_llm(prompt, max_tokens=1024)
     
     try:
         # Extract JSON block from potential surrounding text
-        match = re.search(r'\{.*\}', response, re.DOTALL)
-        json_str = match.group(0) if match else response
-        return json.loads(json_str)
+        return extract_json(response)
     except Exception as e:
         return {
             "error": "Failed to parse matching results",
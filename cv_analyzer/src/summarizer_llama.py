@@ -1,13 +1,11 @@
 from llm_client import query_llm
 
-def summarize_cv_llama(text: str) -> str:
-    prompt = f"""
-    Summarize the following CV into 3-5 concise bullet points highlighting
-    key skills, experiences, and achievements:
+# Fixed instruction block sent first so Ollama can reuse its KV cache across CVs
+SUMMARY_PROMPT_PREFIX = """Summarize the following CV into 3-5 concise bullet points highlighting
+key skills, experiences, and achievements. Only return bullet points.
 
-    {text}
+"""
 
-    Only return bullet points.
-    """
+def summarize_cv_llama(text: str) -> str:
+    prompt = SUMMARY_PROMPT_PREFIX + text
     return query_llm(prompt, max_tokens=1024)
-
@@ -1,5 +1,7 @@
 import networkx as nx
+import numpy as np
 import logging
+from dataclasses import dataclass
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -7,13 +9,84 @@ logger = logging.getLogger(__name__)
 kg = nx.DiGraph()
 
 
+@dataclass
+class CSRGraph:
+    """Read-only Compressed Sparse Row snapshot of ``kg`` for fast traversal.
+
+    Node ``i`` has outgoing neighbours ``out_idx[out_indptr[i]:out_indptr[i + 1]]``
+    with relation ids and edge ids in the matching slices of ``out_lbl`` and
+    ``out_eid``; the ``in_*`` arrays hold the transposed (incoming) adjacency.
+    Relation ids index ``labels``; an edge has the same id in both directions.
+    """
+    nodes: List[str]
+    id_of: Dict[str, int]
+    labels: List[str]
+    out_indptr: np.ndarray
+    out_idx: np.ndarray
+    out_lbl: np.ndarray
+    out_eid: np.ndarray
+    in_indptr: np.ndarray
+    in_idx: np.ndarray
+    in_lbl: np.ndarray
+    in_eid: np.ndarray
+    signature: tuple
+
+
+def _graph_signature(graph: nx.DiGraph) -> tuple:
+    return (id(graph), graph.number_of_nodes(), graph.number_of_edges())
+
+
+def _compress(rows: np.ndarray, cols: np.ndarray, lbl: np.ndarray, n: int):
+    """Groups (row, col, label) edges by row into CSR indptr/indices/labels/edge ids."""
+    order = np.argsort(rows, kind="stable").astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order], lbl[order], order
+
+
+def build_csr(graph: nx.DiGraph) -> CSRGraph:
+    """Builds a CSR snapshot of the graph in O(V + E)."""
+    nodes = list(graph.nodes)
+    id_of = {n: i for i, n in enumerate(nodes)}
+    label_id: Dict[str, int] = {}
+    n_edges = graph.number_of_edges()
+
+    src = np.fromiter((id_of[u] for u, _ in graph.edges), dtype=np.int32, count=n_edges)
+    dst = np.fromiter((id_of[v] for _, v in graph.edges), dtype=np.int32, count=n_edges)
+    lbl = np.fromiter(
+        (label_id.setdefault(d.get("label", ""), len(label_id)) for _, _, d in graph.edges(data=True)),
+        dtype=np.int32, count=n_edges
+    )
+
+    out_indptr, out_idx, out_lbl, out_eid = _compress(src, dst, lbl, len(nodes))
+    in_indptr, in_idx, in_lbl, in_eid = _compress(dst, src, lbl, len(nodes))
+    return CSRGraph(
+        nodes=nodes, id_of=id_of, labels=list(label_id),
+        out_indptr=out_indptr, out_idx=out_idx, out_lbl=out_lbl, out_eid=out_eid,
+        in_indptr=in_indptr, in_idx=in_idx, in_lbl=in_lbl, in_eid=in_eid,
+        signature=_graph_signature(graph),
+    )
+
+
+_csr: CSRGraph = build_csr(kg)
+
+
+def get_csr() -> CSRGraph:
+    """Returns the CSR snapshot of ``kg``, rebuilding it if the graph changed size."""
+    global _csr
+    if _csr.signature != _graph_signature(kg):
+        _csr = build_csr(kg)
+    return _csr
+
+
 class KnowledgeGraph:
     """Manages the module-level NetworkX knowledge graph."""
 
     def __init__(self):
-        self.graph = kg 
+        self.graph = kg
     def add_triples(self, triples: List[Dict[str, str]]):
         """Adds a list of (head, relation, tail) triples to the graph."""
+        global _csr
         for item in triples:
             try:
                 head = item.get("head")
@@ -25,7 +98,10 @@ class KnowledgeGraph:
                     kg.add_node(tail)
                     kg.add_edge(head, tail, label=relation)
             except Exception as e:
-                logger.error(f"Error adding triple {item}: {e}")
+                logger.error("Error adding triple %s: %s", item, e)
+
+        # NetworkX stays the editable store; traversal runs on the CSR snapshot
+        _csr = build_csr(kg)
 
     def get_stats(self):
         return {
@@ -8,8 +8,6 @@ from extractor import GraphExtractor
 from knowledge_graph import KnowledgeGraph, kg
 from retriever import retrieve_graph_context
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 # ──────────────────────────────────────────────
@@ -77,7 +75,7 @@ class GraphRAGPipeline:
     # ──────────────────────────────────────────
     def ask(self, question: str):
         """Retrieves multi-hop context and generates an answer."""
-        logger.info(f"Querying: {question}")
+        logger.info("Querying: %s", question)
 
         # Find entities from the question that exist in the graph
         entities_in_graph = [
@@ -119,6 +117,8 @@ class GraphRAGPipeline:
 
 
 def main():
+    # Configure logging once at startup rather than as an import side effect
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     pipeline = GraphRAGPipeline()
 
     print("=" * 50)
@@ -1,4 +1,6 @@
-from knowledge_graph import kg
+from collections import deque
+
+from knowledge_graph import get_csr
 
 
 # ──────────────────────────────────────────────
@@ -8,34 +10,52 @@ from knowledge_graph import kg
 def retrieve_graph_context(entity, max_depth=2):
     """
     Retrieves contextual triples from the knowledge graph
-    using depth-first multi-hop traversal.
+    using breadth-first multi-hop traversal.
 
     Traverses both outgoing (successors) and incoming (predecessors)
-    edges up to `max_depth` hops from the starting entity.
+    edges up to `max_depth` hops from the starting entity, walking the
+    CSR snapshot of the graph rather than NetworkX's nested dicts.
+    Visited nodes and reported edges are flags in flat byte arrays
+    indexed by integer id, and triples are only turned into strings
+    once, at the end.
     """
-    context = set()
-    visited_nodes = set()
-
-    def dfs(node, depth):
-        if depth > max_depth:
-            return
-        visited_nodes.add(node)
-
-        # 1. Check Outgoing edges (What does this node do?)
-        for neighbor in kg.successors(node):
-            relation = kg.get_edge_data(node, neighbor)["label"]
-            context.add(f"{node} {relation} {neighbor}")
-            if neighbor not in visited_nodes:
-                dfs(neighbor, depth + 1)
-
-        # 2. Check Incoming edges (Who interacts with this node?)
-        for predecessor in kg.predecessors(node):
-            relation = kg.get_edge_data(predecessor, node)["label"]
-            context.add(f"{predecessor} {relation} {node}")
-            if predecessor not in visited_nodes:
-                dfs(predecessor, depth + 1)
-
-    if entity in kg.nodes:
-        dfs(entity, 1)  # Start the traversal
-
-    return ". ".join(context)
+    g = get_csr()
+    if entity not in g.id_of:
+        return ""
+
+    start = g.id_of[entity]
+    seen_edges = bytearray(len(g.out_idx))
+    triples = []
+    visited_nodes = bytearray(len(g.nodes))
+    visited_nodes[start] = 1
+    queue = deque([(start, 1)])
+
+    while queue:
+        node, depth = queue.popleft()
+
+        # 1. Outgoing edges (What does this node do?)
+        lo, hi = g.out_indptr[node], g.out_indptr[node + 1]
+        for neighbor, relation, eid in zip(
+            g.out_idx[lo:hi].tolist(), g.out_lbl[lo:hi].tolist(), g.out_eid[lo:hi].tolist()
+        ):
+            if not seen_edges[eid]:
+                seen_edges[eid] = 1
+                triples.append((node, relation, neighbor))
+            if depth < max_depth and not visited_nodes[neighbor]:
+                visited_nodes[neighbor] = 1
+                queue.append((neighbor, depth + 1))
+
+        # 2. Incoming edges (Who interacts with this node?)
+        lo, hi = g.in_indptr[node], g.in_indptr[node + 1]
+        for predecessor, relation, eid in zip(
+            g.in_idx[lo:hi].tolist(), g.in_lbl[lo:hi].tolist(), g.in_eid[lo:hi].tolist()
+        ):
+            if not seen_edges[eid]:
+                seen_edges[eid] = 1
+                triples.append((predecessor, relation, node))
+            if depth < max_depth and not visited_nodes[predecessor]:
+                visited_nodes[predecessor] = 1
+                queue.append((predecessor, depth + 1))
+
+    nodes, labels = g.nodes, g.labels
+    return ". ".join(f"{nodes[h]} {labels[r]} {nodes[t]}" for h, r, t in triples)
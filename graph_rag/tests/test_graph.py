@@ -61,6 +61,24 @@ class TestGraphRAG(unittest.TestCase):
         context = retrieve_graph_context("Y", max_depth=1)
         self.assertIn("X calls Y", context)
 
+    def test_cycle_edges_reported_once(self):
+        triples = [
+            {"head": "A", "relation": "likes", "tail": "B"},
+            {"head": "B", "relation": "likes", "tail": "A"},
+        ]
+        self.kg_manager.add_triples(triples)
+
+        context = retrieve_graph_context("A", max_depth=3)
+        self.assertEqual(context.split(". ").count("A likes B"), 1)
+        self.assertEqual(context.split(". ").count("B likes A"), 1)
+
+    def test_retrieval_after_clear(self):
+        self.kg_manager.add_triples([{"head": "A", "relation": "connected_to", "tail": "B"}])
+        kg.clear()
+
+        # The traversal snapshot must not outlive the graph it was built from
+        self.assertEqual(retrieve_graph_context("A", max_depth=1), "")
+
 
 if __name__ == "__main__":
     unittest.main()
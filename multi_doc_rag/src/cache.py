@@ -0,0 +1,176 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+class SemanticCache:
+    """
+    Two-level answer cache: exact match on the query text, then cosine
+    similarity against the embeddings of previously answered queries.
+    Entries are evicted least-recently-used once `max_entries` is reached.
+
+    Query vectors live in one C-contiguous float32 matrix that grows by doubling,
+    so a lookup is a single matrix-vector product over the filled rows.
+    """
+
+    _INITIAL_CAPACITY = 64
+
+    def __init__(self, namespace: str, max_entries: int = 2048, threshold: float = 0.92):
+        # The namespace (model ids, collection, ...) is folded into every key
+        # so a model upgrade never serves answers produced by the old setup.
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # key -> [answer, row]
+        self._vecs = None              # (capacity, d) unit vectors, one row per entry
+        self._row_keys = []            # row -> key
+        self._lock = threading.Lock()  # batched queries hit the cache from many threads
+
+    def _key(self, query: str) -> str:
+        return hashlib.blake2b(f"{self.namespace}\0{query}".encode(), digest_size=16).hexdigest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_exact(self, query: str):
+        """Returns the cached answer for this exact query, or None."""
+        key = self._key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_similar(self, query_vec):
+        """Returns the answer of the most similar cached query above the threshold, or None."""
+        q = _normalize(query_vec)
+        with self._lock:
+            if not self._row_keys:
+                return None
+            sims = self._vecs[:len(self._row_keys)] @ q
+            row = int(np.argmax(sims))
+            if sims[row] < self.threshold:
+                return None
+            key = self._row_keys[row]
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, query: str, query_vec, answer: str):
+        key = self._key(query)
+        with self._lock:
+            self._put(key, _normalize(query_vec), answer)
+
+    def _put(self, key, q, answer):
+        if key in self._entries:
+            self._entries[key][0] = answer
+            self._entries.move_to_end(key)
+            return
+        if len(self._entries) >= self.max_entries:
+            self._evict_oldest()
+
+        row = len(self._row_keys)
+        if self._vecs is None:
+            self._vecs = np.empty((min(self._INITIAL_CAPACITY, self.max_entries), q.shape[0]), dtype=np.float32)
+        elif row == len(self._vecs):
+            grown = np.empty((min(2 * len(self._vecs), self.max_entries), self._vecs.shape[1]), dtype=np.float32)
+            grown[:row] = self._vecs
+            self._vecs = grown
+        self._vecs[row] = q
+        self._row_keys.append(key)
+        self._entries[key] = [answer, row]
+
+    def _evict_oldest(self):
+        _, (_, row) = self._entries.popitem(last=False)
+        # Swap-remove: move the last row into the freed slot
+        last = len(self._row_keys) - 1
+        if row != last:
+            moved_key = self._row_keys[last]
+            self._vecs[row] = self._vecs[last]
+            self._row_keys[row] = moved_key
+            self._entries[moved_key][1] = row
+        self._row_keys.pop()
+
+def _normalize(vec):
+    v = np.ascontiguousarray(vec, dtype=np.float32).ravel()
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
+
+def _text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a persistent SQLite cache, so chunks that were
+    already embedded (in this run or a previous one) are never encoded again.
+    Vectors are stored as float16 blobs; rows are namespaced by model/tokenizer
+    version so an upgrade can't serve stale vectors.
+    """
+
+    # SQLite caps bound parameters per statement (999 on older builds)
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, underlying: Embeddings, db_path: str, namespace: str):
+        self.underlying = underlying
+        self.db_path = db_path
+        self.namespace = namespace
+        self._conn = None
+
+    def _connect(self):
+        # Opened lazily so merely importing the store doesn't create its directory
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _lookup(self, keys):
+        conn = self._connect()
+        found = {}
+        for i in range(0, len(keys), self._LOOKUP_BATCH):
+            batch = keys[i:i + self._LOOKUP_BATCH]
+            rows = conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE namespace = ? AND key IN ({','.join('?' * len(batch))})",
+                [self.namespace, *batch]
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float16)
+        return found
+
+    def embed_documents(self, texts):
+        keys = [_text_key(t) for t in texts]
+        found = self._lookup(list(set(keys)))
+
+        # Encode each missing text once, even if it repeats within the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            rows = []
+            for key, vec in zip(missing, vectors):
+                # Round-trip through float16 so hits and misses return identical vectors
+                found[key] = np.asarray(vec, dtype=np.float16)
+                rows.append((self.namespace, key, found[key].tobytes()))
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+
+        return [found[key].astype(np.float32).tolist() for key in keys]
+
+    def embed_query(self, text):
+        # Questions are one-off and private to the user, so they bypass the chunk cache
+        return self.underlying.embed_query(text)
@@ -1,12 +1,54 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List
+import re
+from langchain_core.documents import Document
+from typing import Iterable, Iterator, List
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# Paragraph breaks, or whitespace between a sentence end and a capitalised word
+_SPLIT_RE = re.compile(r"(?:\r?\n){2,}|(?<=[.!?])\s+(?=[A-Z])")
+
+def _fast_split(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Splits text on paragraph/sentence boundaries in a single regex pass, then
+    greedily packs the segments into windows of at most `size` characters.
+    Each window starts with up to `overlap` characters from the end of the previous one.
+    """
+    segments = []
+    for seg in _SPLIT_RE.split(text):
+        seg = seg.strip()
+        # A boundary-free run longer than a window is cut into window-sized pieces
+        for start in range(0, len(seg), size):
+            segments.append(seg[start:start + size])
+
+    chunks = []
+    window = ""
+    for seg in segments:
+        if not window:
+            window = seg
+        elif len(window) + 1 + len(seg) <= size:
+            window = f"{window} {seg}"
+        else:
+            chunks.append(window)
+            # Carry a word-aligned suffix of the previous window, shrunk to fit
+            room = min(overlap, size - 1 - len(seg))
+            tail = window[-room:] if room > 0 else ""
+            if tail and len(tail) < len(window):
+                cut = tail.find(" ")
+                tail = tail[cut + 1:] if cut != -1 else ""
+            window = f"{tail} {seg}" if tail else seg
+    if window:
+        chunks.append(window)
+    return chunks
+
+def iter_chunks(documents: Iterable) -> Iterator[Document]:
+    """Splits documents lazily, so pages can be released as soon as they are chunked."""
+    for doc in documents:
+        for piece in _fast_split(doc.page_content):
+            yield Document(page_content=piece, metadata=dict(doc.metadata))
 
 def split_text(documents: List):
     """Splits documents into smaller chunks for processing."""
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-    )
-    chunks = splitter.split_documents(documents)
+    chunks = list(iter_chunks(documents))
     print(f"✂️ Created {len(chunks)} chunks.")
     return chunks
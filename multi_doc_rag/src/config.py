@@ -4,9 +4,37 @@ import os
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 LLM_MODEL = os.getenv("LLM_MODEL", "llama3")
 
+# Embedding model
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Answer cache (exact + semantic). Bump the version to invalidate cached answers.
+ANSWER_CACHE_SIZE = 2048
+SEMANTIC_CACHE_THRESHOLD = 0.92
+ANSWER_CACHE_VERSION = "1"
+
 # Local storage
 CHROMA_PERSIST_DIRECTORY = "./chroma_db"
 COLLECTION_NAME = "rag_docs"
+EMBEDDING_CACHE_PATH = os.path.join(CHROMA_PERSIST_DIRECTORY, "emb_cache.sqlite")
+FAISS_INDEX_DIRECTORY = os.path.join(CHROMA_PERSIST_DIRECTORY, "faiss")
+
+# HNSW index tuning (search_ef trades recall for query latency)
+HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "64"))
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": HNSW_SEARCH_EF,
+}
+
+# Corpora at least this large go to a product-quantized FAISS IVF-PQ index instead
+# of Chroma (48 B/vector instead of 1.5 KB); nprobe trades recall for latency.
+# Counted in PDF pages, which are known before any text is extracted (~4 chunks/page, so ~50k chunks)
+IVFPQ_MIN_PAGES = int(os.getenv("IVFPQ_MIN_PAGES", "12500"))
+IVFPQ_NLIST = 1024
+IVFPQ_M = 48
+IVFPQ_NBITS = 8
+IVFPQ_NPROBE = int(os.getenv("IVFPQ_NPROBE", "16"))
 
 # Data paths
 DOCS_DIRECTORY = "./data"
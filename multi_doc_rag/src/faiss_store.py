@@ -0,0 +1,97 @@
+import uuid
+from itertools import islice
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from src.config import IVFPQ_NLIST, IVFPQ_M, IVFPQ_NBITS, IVFPQ_NPROBE
+
+# Enough points to train 1024 IVF centroids and the 256-entry PQ codebooks
+IVFPQ_TRAIN_SIZE = 65536
+# FAISS k-means wants ~39 points per centroid; below this the 2^IVFPQ_NBITS PQ
+# codebooks can't be trained, so the vectors go into an exact flat index instead
+POINTS_PER_CENTROID = 39
+IVFPQ_MIN_TRAIN = POINTS_PER_CENTROID * 2 ** IVFPQ_NBITS
+ADD_BATCH_SIZE = 4096
+
+class IVFPQStore(FAISS):
+    """
+    FAISS vector store backed by an IVF-PQ index. Each 384-dim vector is stored
+    as IVFPQ_M one-byte codes (48 B instead of 1536 B of float32), so large
+    corpora stay cache-resident. Stored vectors are L2-normalised and scored by
+    inner product, which ranks results by cosine similarity like the Chroma collection.
+    """
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, **kwargs):
+        metadatas = metadatas or ({} for _ in texts)
+        documents = (Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas))
+        return cls.from_document_stream(documents, embedding, ids=ids, **kwargs)
+
+    @classmethod
+    def from_document_stream(cls, documents, embedding, ids=None, **kwargs):
+        """
+        Builds the index from an iterable of documents without materialising it.
+        The first IVFPQ_TRAIN_SIZE documents train the quantizers, and the rest
+        are embedded and added ADD_BATCH_SIZE at a time, so full-precision vectors
+        are only ever held for one batch (or the training sample).
+        """
+        import faiss
+
+        documents = iter(documents)
+        ids = iter(ids) if ids is not None else None
+        docstore, index_to_id = {}, {}
+
+        def embed(docs):
+            vectors = np.asarray(embedding.embed_documents([d.page_content for d in docs]), dtype=np.float32)
+            faiss.normalize_L2(vectors)
+            return vectors
+
+        def keep(docs):
+            for doc in docs:
+                doc_id = next(ids) if ids is not None else str(uuid.uuid4())
+                index_to_id[len(index_to_id)] = doc_id
+                docstore[doc_id] = doc
+
+        sample_docs = list(islice(documents, IVFPQ_TRAIN_SIZE))
+        if not sample_docs:
+            raise ValueError("No documents to index")
+        sample = embed(sample_docs)
+        dim = sample.shape[1]
+        if len(sample) < IVFPQ_MIN_TRAIN:
+            # A short sample means the stream is exhausted, so this is the whole corpus
+            print(f"⚠️ Only {len(sample)} chunks; too few to train IVF-PQ, using an exact index")
+            index = faiss.IndexFlatIP(dim)
+        else:
+            nlist = min(IVFPQ_NLIST, len(sample) // POINTS_PER_CENTROID)
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, IVFPQ_M, IVFPQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+            index.train(sample)
+            index.nprobe = min(IVFPQ_NPROBE, nlist)
+        index.add(sample)
+        keep(sample_docs)
+        del sample, sample_docs
+        while batch := list(islice(documents, ADD_BATCH_SIZE)):
+            index.add(embed(batch))
+            keep(batch)
+
+        return cls(
+            embedding,
+            index,
+            InMemoryDocstore(docstore),
+            index_to_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            **kwargs
+        )
+
+    @classmethod
+    def load_local(cls, folder_path, embeddings, **kwargs):
+        import faiss
+
+        store = super().load_local(folder_path, embeddings, **kwargs)
+        # Corpora too small to train IVF-PQ were saved as a flat index
+        if isinstance(store.index, faiss.IndexIVF):
+            store.index.nprobe = min(IVFPQ_NPROBE, store.index.nlist)
+        return store
@@ -1,25 +1,80 @@
 import os
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
 from langchain_community.document_loaders import PyPDFLoader
 from src.config import DOCS_DIRECTORY
 
-def load_documents(folder_path: str = DOCS_DIRECTORY):
-    """Loads all PDF documents from the specified folder."""
+def _load_one(file_path: str) -> List:
+    """Loads a single PDF. Top-level so it can be pickled into a worker process."""
+    filename = os.path.basename(file_path)
+    print(f"📄 Loading: {filename}")
+    try:
+        return list(PyPDFLoader(file_path).lazy_load())
+    except Exception as e:
+        print(f"❌ Error loading {filename}: {e}")
+        return []
+
+def _iter_one(file_path: str) -> Iterator:
+    """Yields a PDF's pages one at a time, in this process."""
+    filename = os.path.basename(file_path)
+    print(f"📄 Loading: {filename}")
+    try:
+        yield from PyPDFLoader(file_path).lazy_load()
+    except Exception as e:
+        print(f"❌ Error loading {filename}: {e}")
+
+def list_pdfs(folder_path: str = DOCS_DIRECTORY) -> List[str]:
+    """Returns the PDF paths in a folder, creating the folder if it is missing."""
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
         print(f"📁 Created directory: {folder_path}")
         return []
 
-    documents = []
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".pdf"):
-            file_path = os.path.join(folder_path, filename)
-            print(f"📄 Loading: {filename}")
-            try:
-                loader = PyPDFLoader(file_path)
-                documents.extend(loader.load())
-            except Exception as e:
-                print(f"❌ Error loading {filename}: {e}")
-    
+    # DirEntry caches the file type, so skipping subdirectories costs no extra stat
+    with os.scandir(folder_path) as it:
+        return [e.path for e in it if e.name.endswith(".pdf") and e.is_file(follow_symlinks=False)]
+
+def count_pages(folder_path: str = DOCS_DIRECTORY) -> int:
+    """
+    Total page count of the folder's PDFs. Only each file's page tree is read,
+    not its text, so this is cheap next to loading the pages.
+    """
+    from pypdf import PdfReader
+
+    total = 0
+    for path in list_pdfs(folder_path):
+        try:
+            total += len(PdfReader(path).pages)
+        except Exception as e:
+            print(f"❌ Error reading {os.path.basename(path)}: {e}")
+    return total
+
+def iter_documents(folder_path: str = DOCS_DIRECTORY) -> Iterator:
+    """
+    Yields the pages of every PDF in the folder, file by file. PDFs are parsed
+    across a process pool, but at most 2x the worker count are in flight, so only
+    a handful of PDFs' pages are held in memory at any time.
+    """
+    paths = list_pdfs(folder_path)
+    if len(paths) <= 1:
+        # Not worth spinning up worker processes for a single file
+        for path in paths:
+            yield from _iter_one(path)
+        return
+
+    workers = min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque()
+        for path in paths:
+            pending.append(ex.submit(_load_one, path))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def load_documents(folder_path: str = DOCS_DIRECTORY):
+    """Loads all PDF documents from the specified folder, parsing them in parallel."""
+    documents = list(iter_documents(folder_path))
     print(f"✅ Loaded {len(documents)} document pages.")
     return documents
@@ -1,14 +1,13 @@
 import os
 import sys
+from itertools import chain
 
 # Ensure the app can find the src directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.config import DOCS_DIRECTORY, CHROMA_PERSIST_DIRECTORY
-from src.loader import load_documents
-from src.chunker import split_text
-from src.vector_store import create_vector_store, load_vector_store
-from src.pipeline import query_rag_system
+from src.config import DOCS_DIRECTORY, CHROMA_PERSIST_DIRECTORY, IVFPQ_MIN_PAGES
+from src.loader import count_pages, iter_documents
+from src.chunker import iter_chunks
 
 def main():
     print("=" * 50)
@@ -18,19 +17,28 @@ def main():
     # Step 1: Handle Vector Database
     if not os.path.exists(CHROMA_PERSIST_DIRECTORY):
         print("📦 No vector DB found. Creating one...")
-        docs = load_documents(DOCS_DIRECTORY)
-        if not docs:
+        # The backend is picked from the page count, before any text is extracted
+        use_ivfpq = count_pages(DOCS_DIRECTORY) >= IVFPQ_MIN_PAGES
+        # Pages are loaded, chunked and indexed as a stream rather than all at once
+        chunks = iter_chunks(iter_documents(DOCS_DIRECTORY))
+        first = next(chunks, None)
+        if first is None:
             print(f"❌ No PDF documents found in {DOCS_DIRECTORY}.")
             print("Please add some PDFs and restart the application.")
             return
-            
-        chunks = split_text(docs)
-        vector_store = create_vector_store(chunks)
+
+        # Heavy imports (Chroma, embeddings, LangChain) are deferred until they're needed,
+        # so the banner and the no-PDF path start instantly
+        from src.vector_store import create_vector_store
+        vector_store = create_vector_store(chain([first], chunks), use_ivfpq=use_ivfpq)
         print("✅ Vector database created successfully.")
     else:
         print("📦 Loading existing vector DB...")
+        from src.vector_store import load_vector_store
         vector_store = load_vector_store()
 
+    from src.pipeline import query_rag_system
+
     # Step 2: Interactive Chat Loop
     print("\n🚀 Ready! You can now ask questions about your documents.")
     print("Type 'exit' to quit.\n")
@@ -1,49 +1,151 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from src.config import OLLAMA_BASE_URL, LLM_MODEL
+from src.cache import CachedEmbeddings, SemanticCache
+from src.config import (
+    OLLAMA_BASE_URL, LLM_MODEL, EMBEDDING_MODEL_NAME, COLLECTION_NAME,
+    ANSWER_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, ANSWER_CACHE_VERSION
+)
+
+# Answers are only reused for the same embedder, LLM, collection and cache version
+_answer_cache = SemanticCache(
+    namespace=f"{EMBEDDING_MODEL_NAME}|{LLM_MODEL}|{COLLECTION_NAME}|{ANSWER_CACHE_VERSION}",
+    max_entries=ANSWER_CACHE_SIZE,
+    threshold=SEMANTIC_CACHE_THRESHOLD
+)
+
+# Prompt and parser are immutable, so build them once
+RAG_PROMPT = ChatPromptTemplate.from_template(
+    """
+    You are a helpful assistant.
+    Answer ONLY using the context below.
+    If the answer is not present in the context, say "I don't know."
+
+    Context:
+    {context}
+
+    Question:
+    {question}
+    """
+)
+OUTPUT_PARSER = StrOutputParser()
+
+RETRIEVAL_K = 3
 
 def format_docs(docs):
     """Formats retrieved documents into a single string."""
-    return "\n\n".join(doc.page_content for doc in docs)
+    # A list (not a generator) lets str.join size the result in a single pass
+    return "\n\n".join([doc.page_content for doc in docs])
 
-def get_rag_chain(vector_store):
-    """Constructs the RAG chain."""
-    llm = ChatOllama(
+def _get_llm(model=LLM_MODEL):
+    return ChatOllama(
         base_url=OLLAMA_BASE_URL,
-        model=LLM_MODEL
+        model=model,
+        # One keep-alive HTTP client per chain instead of a new connection per query
+        client_kwargs={"timeout": 60}
     )
 
-    retriever = vector_store.as_retriever(search_kwargs={"k": 3})
+@lru_cache(maxsize=4)
+def _get_answer_chain(model):
+    """Prompt -> LLM -> parser, for callers that have already retrieved the context."""
+    return RAG_PROMPT | _get_llm(model) | OUTPUT_PARSER
 
-    prompt = ChatPromptTemplate.from_template(
-        """
-        You are a helpful assistant.
-        Answer ONLY using the context below.
-        If the answer is not present in the context, say "I don't know."
+def _embed_queries(embeddings, texts):
+    """Encodes a batch of queries in one forward pass, bypassing the on-disk chunk cache."""
+    if isinstance(embeddings, CachedEmbeddings):
+        embeddings = embeddings.underlying
+    return embeddings.embed_documents(texts)
 
-        Context:
-        {context}
+class BatchedRetriever:
+    """
+    Micro-batches retrieval for concurrent callers. Queries submitted from many
+    threads are collected for up to `max_wait` seconds (or `max_batch` queries),
+    embedded in one forward pass, and each caller's future resolves to its
+    (query vector, documents).
+    """
 
-        Question:
-        {question}
-        """
-    )
+    def __init__(self, vector_store, k=RETRIEVAL_K, max_batch=32, max_wait=0.02):
+        self.vector_store = vector_store
+        self.k = k
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
 
-    chain = (
-        {
-            "context": retriever | format_docs,
-            "question": RunnablePassthrough(),
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
-    
-    return chain
+    def submit(self, query_text) -> Future:
+        future = Future()
+        self._queue.put((query_text, future))
+        return future
+
+    def retrieve(self, query_text):
+        """Blocks until the batch containing this query has been searched."""
+        return self.submit(query_text).result()
 
-def query_rag_system(query_text, vector_store):
-    """Invokes the RAG chain for a user query."""
-    chain = get_rag_chain(vector_store)
-    return chain.invoke(query_text)
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                vectors = _embed_queries(self.vector_store.embeddings, [text for text, _ in batch])
+                for (_, future), vec in zip(batch, vectors):
+                    docs = self.vector_store.similarity_search_by_vector(vec, k=self.k)
+                    future.set_result((vec, docs))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+@lru_cache(maxsize=4)
+def _get_batched_retriever(vector_store):
+    return BatchedRetriever(vector_store)
+
+def query_rag_system(query_text, vector_store, batched=False):
+    """
+    Invokes the RAG chain for a user query, reusing answers to repeated or paraphrased questions.
+    With `batched=True` (for concurrent service callers), retrieval is micro-batched across threads.
+    """
+    cached = _answer_cache.get_exact(query_text)
+    if cached is not None:
+        return cached
+
+    if batched:
+        query_vec, docs = _get_batched_retriever(vector_store).retrieve(query_text)
+        cached = _answer_cache.get_similar(query_vec)
+        if cached is not None:
+            return cached
+        answer = _get_answer_chain(LLM_MODEL).invoke(
+            {"context": format_docs(docs), "question": query_text}
+        )
+        _answer_cache.put(query_text, query_vec, answer)
+        return answer
+
+    query_vec = vector_store.embeddings.embed_query(query_text)
+    cached = _answer_cache.get_similar(query_vec)
+    if cached is not None:
+        return cached
+
+    # Search with the vector already computed for the cache instead of embedding the query again
+    docs = vector_store.similarity_search_by_vector(query_vec, k=RETRIEVAL_K)
+    answer = _get_answer_chain(LLM_MODEL).invoke(
+        {"context": format_docs(docs), "question": query_text}
+    )
+    _answer_cache.put(query_text, query_vec, answer)
+    return answer
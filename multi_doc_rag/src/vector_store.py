@@ -1,27 +1,70 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import os
+from functools import lru_cache
+from itertools import islice
 from langchain_chroma import Chroma
-from src.config import CHROMA_PERSIST_DIRECTORY, COLLECTION_NAME
-
-# Initialize embeddings once
-embedding_function = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
+from src.cache import CachedEmbeddings
+from src.faiss_store import IVFPQStore
+from src.config import (
+    CHROMA_PERSIST_DIRECTORY, COLLECTION_NAME, COLLECTION_METADATA,
+    EMBEDDING_MODEL_NAME, EMBEDDING_CACHE_PATH, FAISS_INDEX_DIRECTORY
 )
 
-def create_vector_store(chunks):
-    """Creates a Chroma vector store from text chunks."""
+INSERT_BATCH_SIZE = 512
+
+@lru_cache(maxsize=1)
+def _get_embedding_function():
+    """
+    Loads the embedding model on first use rather than at import, so startup
+    paths that never embed (no PDFs, immediate exit) skip the model load.
+    Vectors persist on disk so re-runs skip encoding.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from transformers import __version__ as transformers_version
+
+    return CachedEmbeddings(
+        HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME),
+        db_path=EMBEDDING_CACHE_PATH,
+        namespace=f"{EMBEDDING_MODEL_NAME}:{transformers_version}"
+    )
+
+def create_vector_store(chunks, use_ivfpq=False):
+    """
+    Creates a vector store from an iterable of chunks: Chroma, or IVF-PQ FAISS
+    when use_ivfpq is set (see IVFPQ_MIN_PAGES). Either way chunks are pulled
+    and embedded a batch at a time, so a chunk generator is never materialised.
+    """
+    chunks = iter(chunks)
+    if use_ivfpq:
+        vector_store = IVFPQStore.from_document_stream(chunks, _get_embedding_function())
+        vector_store.save_local(FAISS_INDEX_DIRECTORY)
+        print(f"📦 IVF-PQ index for {vector_store.index.ntotal} chunks saved to {FAISS_INDEX_DIRECTORY}")
+        return vector_store
+
+    batch = list(islice(chunks, INSERT_BATCH_SIZE))
     vector_store = Chroma.from_documents(
-        documents=chunks,
-        embedding=embedding_function,
+        documents=batch,
+        embedding=_get_embedding_function(),
         persist_directory=CHROMA_PERSIST_DIRECTORY,
-        collection_name=COLLECTION_NAME
+        collection_name=COLLECTION_NAME,
+        collection_metadata=COLLECTION_METADATA
     )
-    print(f"📦 Vector database created and saved to {CHROMA_PERSIST_DIRECTORY}")
+    total = len(batch)
+    while batch := list(islice(chunks, INSERT_BATCH_SIZE)):
+        vector_store.add_documents(batch)
+        total += len(batch)
+    print(f"📦 Vector database with {total} chunks saved to {CHROMA_PERSIST_DIRECTORY}")
     return vector_store
 
 def load_vector_store():
-    """Loads an existing Chroma vector store."""
+    """Loads the existing vector store, preferring a saved IVF-PQ index."""
+    if os.path.isdir(FAISS_INDEX_DIRECTORY):
+        # The pickled docstore was written by create_vector_store, not a third party
+        return IVFPQStore.load_local(
+            FAISS_INDEX_DIRECTORY, _get_embedding_function(), allow_dangerous_deserialization=True
+        )
     return Chroma(
         persist_directory=CHROMA_PERSIST_DIRECTORY,
-        embedding_function=embedding_function,
-        collection_name=COLLECTION_NAME
+        embedding_function=_get_embedding_function(),
+        collection_name=COLLECTION_NAME,
+        collection_metadata=COLLECTION_METADATA
     )
@@ -0,0 +1,95 @@
+import numpy as np
+from src.cache import SemanticCache, CachedEmbeddings
+
+def test_exact_hit():
+    """Test that an identical query returns the stored answer."""
+    cache = SemanticCache(namespace="test")
+    cache.put("what is rag?", [1.0, 0.0], "retrieval augmented generation")
+    assert cache.get_exact("what is rag?") == "retrieval augmented generation"
+    assert cache.get_exact("something else") is None
+
+def test_semantic_hit_and_miss():
+    """Test that near-duplicate embeddings hit and dissimilar ones miss."""
+    cache = SemanticCache(namespace="test", threshold=0.9)
+    cache.put("q1", [1.0, 0.0], "a1")
+    assert cache.get_similar([0.99, 0.05]) == "a1"
+    assert cache.get_similar([0.0, 1.0]) is None
+
+def test_namespace_isolates_entries():
+    """Test that a different namespace (e.g. new model) does not reuse answers."""
+    old = SemanticCache(namespace="model-a")
+    new = SemanticCache(namespace="model-b")
+    old.put("q", [1.0, 0.0], "a")
+    assert old._key("q") != new._key("q")
+
+def test_lru_eviction_keeps_vectors_aligned():
+    """Test that evicting the oldest entry keeps the remaining vectors mapped to their answers."""
+    cache = SemanticCache(namespace="test", max_entries=2, threshold=0.99)
+    cache.put("q1", [1.0, 0.0, 0.0], "a1")
+    cache.put("q2", [0.0, 1.0, 0.0], "a2")
+    cache.put("q3", [0.0, 0.0, 1.0], "a3")
+
+    assert len(cache) == 2
+    assert cache.get_exact("q1") is None
+    assert cache.get_similar(np.array([0.0, 1.0, 0.0])) == "a2"
+    assert cache.get_similar(np.array([0.0, 0.0, 1.0])) == "a3"
+    assert cache.get_similar(np.array([1.0, 0.0, 0.0])) is None
+
+class CountingEmbeddings:
+    """Fake embedder that records which texts it was asked to encode."""
+    def __init__(self):
+        self.seen = []
+
+    def embed_documents(self, texts):
+        self.seen.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def test_cached_embeddings_persist_across_instances(tmp_path):
+    """Test that vectors encoded once are served from disk by a fresh instance."""
+    db_path = str(tmp_path / "emb_cache.sqlite")
+    first = CountingEmbeddings()
+    vecs = CachedEmbeddings(first, db_path, "model:1").embed_documents(["a", "bb", "a"])
+    assert first.seen == ["a", "bb"]
+    assert vecs[0] == vecs[2] == [1.0, 1.0]
+
+    second = CountingEmbeddings()
+    cached = CachedEmbeddings(second, db_path, "model:1")
+    assert cached.embed_documents(["bb", "ccc"]) == [[2.0, 1.0], [3.0, 1.0]]
+    assert second.seen == ["ccc"]
+
+def test_cached_embeddings_namespaced_by_model(tmp_path):
+    """Test that a different model namespace does not reuse cached vectors."""
+    db_path = str(tmp_path / "emb_cache.sqlite")
+    CachedEmbeddings(CountingEmbeddings(), db_path, "model:1").embed_documents(["hello"])
+
+    upgraded = CountingEmbeddings()
+    CachedEmbeddings(upgraded, db_path, "model:2").embed_documents(["hello"])
+    assert upgraded.seen == ["hello"]
+
+def test_cached_embeddings_do_not_store_queries(tmp_path):
+    """Test that queries are encoded directly and never written to the chunk cache."""
+    db_path = str(tmp_path / "emb_cache.sqlite")
+    underlying = CountingEmbeddings()
+    cached = CachedEmbeddings(underlying, db_path, "model:1")
+
+    assert cached.embed_query("what is rag?") == [12.0, 1.0]
+    assert cached.embed_query("what is rag?") == [12.0, 1.0]
+    assert underlying.seen == ["what is rag?", "what is rag?"]
+    assert cached._conn is None
+
+def test_matrix_grows_past_initial_capacity():
+    """Test that the vector matrix doubles as entries are added and stays searchable."""
+    cache = SemanticCache(namespace="test", max_entries=200, threshold=0.999)
+    for i in range(150):
+        vec = np.zeros(150, dtype=np.float32)
+        vec[i] = 1.0
+        cache.put(f"q{i}", vec, f"a{i}")
+
+    assert cache._vecs.shape[0] == 200
+    assert cache._vecs.flags["C_CONTIGUOUS"]
+    probe = np.zeros(150, dtype=np.float32)
+    probe[3] = 1.0
+    assert cache.get_similar(probe) == "a3"
@@ -10,3 +10,28 @@ def test_split_text():
     assert len(chunks) > 0
     assert isinstance(chunks[0], Document)
     assert len(chunks[0].page_content) <= 1000
+
+def test_split_text_overlap_and_metadata():
+    """Test that chunks respect the size limit, overlap, and keep the source metadata."""
+    text = " ".join(f"Sentence number {i} is here." for i in range(200))
+    docs = [Document(page_content=text, metadata={"source": "a.pdf", "page": 3})]
+    chunks = split_text(docs)
+    assert len(chunks) > 1
+    assert all(len(c.page_content) <= 1000 for c in chunks)
+    assert chunks[1].metadata == {"source": "a.pdf", "page": 3}
+    # The second window starts with the tail of the first
+    assert chunks[1].page_content[:100] in chunks[0].page_content[-200:]
+
+def test_iter_chunks_is_lazy():
+    """Test that chunks are produced as documents are consumed, not all up front."""
+    from src.chunker import iter_chunks
+    consumed = []
+
+    def docs():
+        for i in range(3):
+            consumed.append(i)
+            yield Document(page_content=f"Document {i}.")
+
+    chunks = iter_chunks(docs())
+    assert next(chunks).page_content == "Document 0."
+    assert consumed == [0]
@@ -0,0 +1,30 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from src.faiss_store import IVFPQStore
+
+class OneHotEmbeddings(Embeddings):
+    """Fake embedder mapping "doc <i>" to the i-th basis vector."""
+    def embed_documents(self, texts):
+        return [[1.0 if j == int(t.split()[-1]) else 0.0 for j in range(96)] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def test_small_corpus_falls_back_to_flat_index(tmp_path):
+    """Test that too few chunks to train IVF-PQ still build a searchable store."""
+    import faiss
+    docs = (Document(page_content=f"doc {i}") for i in range(20))
+
+    store = IVFPQStore.from_document_stream(docs, OneHotEmbeddings())
+    assert not isinstance(store.index, faiss.IndexIVF)
+    assert store.index.ntotal == 20
+
+    store.save_local(str(tmp_path))
+    loaded = IVFPQStore.load_local(str(tmp_path), OneHotEmbeddings(), allow_dangerous_deserialization=True)
+    assert loaded.similarity_search("doc 7", k=1)[0].page_content == "doc 7"
+
+def test_empty_stream_raises():
+    """Test that an empty stream is rejected instead of failing inside FAISS."""
+    with pytest.raises(ValueError):
+        IVFPQStore.from_document_stream(iter([]), OneHotEmbeddings())
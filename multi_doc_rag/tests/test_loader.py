@@ -1,6 +1,6 @@
 import os
 import pytest
-from src.loader import load_documents
+from src.loader import count_pages, load_documents
 
 def test_load_documents_invalid_path():
     """Test behavior with an invalid folder path."""
@@ -23,8 +23,28 @@ def test_load_documents_with_pdfs(tmp_path, mocker):
     # Mock PyPDFLoader
     mock_loader = mocker.patch("src.loader.PyPDFLoader")
     mock_instance = mock_loader.return_value
-    mock_instance.load.return_value = [{"page_content": "pdf content", "metadata": {}}]
+    mock_instance.lazy_load.return_value = iter([{"page_content": "pdf content", "metadata": {}}])
     
     docs = load_documents(str(tmp_path))
     assert len(docs) == 1
     assert docs[0]["page_content"] == "pdf content"
+
+def test_load_documents_skips_pdf_named_directories(tmp_path, mocker):
+    """Test that only regular .pdf files are handed to the loader."""
+    (tmp_path / "folder.pdf").mkdir()
+    (tmp_path / "notes.txt").write_text("not a pdf")
+    mock_loader = mocker.patch("src.loader.PyPDFLoader")
+
+    assert load_documents(str(tmp_path)) == []
+    mock_loader.assert_not_called()
+
+def test_count_pages_reads_page_trees_only(tmp_path, mocker):
+    """Test that pages are counted per PDF without loading their text."""
+    (tmp_path / "a.pdf").write_text("dummy")
+    (tmp_path / "b.pdf").write_text("dummy")
+    mock_reader = mocker.patch("pypdf.PdfReader")
+    mock_reader.return_value.pages = [object()] * 3
+    mock_loader = mocker.patch("src.loader.PyPDFLoader")
+
+    assert count_pages(str(tmp_path)) == 6
+    mock_loader.assert_not_called()
@@ -1,5 +1,5 @@
 import pytest
-from src.pipeline import get_rag_chain, format_docs
+from src.pipeline import format_docs
 from langchain_core.documents import Document
 
 def test_format_docs():
@@ -11,15 +11,57 @@ def test_format_docs():
     formatted = format_docs(docs)
     assert formatted == "doc1\n\ndoc2"
 
-def test_get_rag_chain(mocker):
-    """Test chain construction (mocked)."""
+def test_llm_uses_requested_model(mocker):
+    """Test that the answer chain's LLM is built for the model it is cached under."""
+    from src import pipeline
+    chat = mocker.patch("src.pipeline.ChatOllama")
+
+    pipeline._get_llm("other-model")
+
+    assert chat.call_args.kwargs["model"] == "other-model"
+
+def test_query_embedded_once_per_uncached_question(mocker):
+    """Test that retrieval reuses the query vector computed for the semantic cache."""
+    from src import pipeline
+    mocker.patch.object(pipeline, "_answer_cache", pipeline.SemanticCache(namespace="test"))
+    answer_chain = mocker.patch("src.pipeline._get_answer_chain")
+    answer_chain.return_value.invoke.side_effect = lambda inputs: f"answer to {inputs['question']}"
+
+    mock_vector_store = mocker.Mock()
+    mock_vector_store.embeddings.embed_query.side_effect = [[1.0, 0.0], [0.0, 1.0]]
+    mock_vector_store.similarity_search_by_vector.return_value = [Document(page_content="doc")]
+
+    assert pipeline.query_rag_system("first", mock_vector_store) == "answer to first"
+    assert pipeline.query_rag_system("second", mock_vector_store) == "answer to second"
+    assert mock_vector_store.embeddings.embed_query.call_count == 2
+    mock_vector_store.similarity_search_by_vector.assert_called_with([0.0, 1.0], k=pipeline.RETRIEVAL_K)
+    mock_vector_store.as_retriever.assert_not_called()
+
+def test_batched_retriever_embeds_concurrent_queries_together(mocker):
+    """Test that queries submitted together are embedded in a single call."""
+    from src.pipeline import BatchedRetriever
     mock_vector_store = mocker.Mock()
-    mock_vector_store.as_retriever.return_value = mocker.Mock()
-    
-    # Mock ChatOllama to avoid API calls
-    mocker.patch("src.pipeline.ChatOllama")
-    
-    chain = get_rag_chain(mock_vector_store)
-    
-    assert chain is not None
-    mock_vector_store.as_retriever.assert_called_once()
+    mock_vector_store.embeddings.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    mock_vector_store.similarity_search_by_vector.side_effect = lambda vec, k: [f"doc for {vec[0]}"]
+
+    retriever = BatchedRetriever(mock_vector_store, max_wait=0.5)
+    futures = [retriever.submit(q) for q in ("a", "bb", "ccc")]
+    results = [f.result(timeout=5) for f in futures]
+
+    assert results == [([1.0], ["doc for 1.0"]), ([2.0], ["doc for 2.0"]), ([3.0], ["doc for 3.0"])]
+    mock_vector_store.embeddings.embed_documents.assert_called_once_with(["a", "bb", "ccc"])
+
+def test_batched_retriever_bypasses_embedding_cache(mocker, tmp_path):
+    """Test that batched queries are encoded by the model and never persisted."""
+    from src.cache import CachedEmbeddings
+    from src.pipeline import BatchedRetriever
+    underlying = mocker.Mock()
+    underlying.embed_documents.side_effect = lambda texts: [[1.0] for _ in texts]
+    cached = CachedEmbeddings(underlying, str(tmp_path / "emb_cache.sqlite"), "model:1")
+    mock_vector_store = mocker.Mock(embeddings=cached)
+    mock_vector_store.similarity_search_by_vector.return_value = []
+
+    BatchedRetriever(mock_vector_store).retrieve("question")
+
+    underlying.embed_documents.assert_called_once_with(["question"])
+    assert cached._conn is None
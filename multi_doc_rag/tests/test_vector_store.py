@@ -13,6 +13,7 @@ def test_create_vector_store(mocker):
     args, kwargs = mock_chroma.call_args
     assert kwargs["documents"] == chunks
     assert kwargs["collection_name"] == "rag_docs"
+    assert kwargs["collection_metadata"]["hnsw:space"] == "cosine"
 
 def test_load_vector_store(mocker):
     """Test loading an existing vector store."""
@@ -23,3 +24,28 @@ def test_load_vector_store(mocker):
     mock_chroma.assert_called_once()
     args, kwargs = mock_chroma.call_args
     assert kwargs["collection_name"] == "rag_docs"
+
+def test_create_vector_store_large_corpus_uses_ivfpq(mocker):
+    """Test that large corpora are streamed into IVF-PQ instead of Chroma."""
+    mock_chroma = mocker.patch("src.vector_store.Chroma.from_documents")
+    mock_ivfpq = mocker.patch("src.vector_store.IVFPQStore.from_document_stream")
+    chunks = iter([Document(page_content="a"), Document(page_content="b")])
+
+    create_vector_store(chunks, use_ivfpq=True)
+
+    mock_chroma.assert_not_called()
+    mock_ivfpq.assert_called_once()
+    assert list(mock_ivfpq.call_args.args[0]) == [Document(page_content="a"), Document(page_content="b")]
+    mock_ivfpq.return_value.save_local.assert_called_once()
+
+def test_create_vector_store_inserts_in_batches(mocker):
+    """Test that Chroma is filled one batch at a time from a chunk generator."""
+    mocker.patch("src.vector_store.INSERT_BATCH_SIZE", 2)
+    mock_chroma = mocker.patch("src.vector_store.Chroma.from_documents")
+    chunks = (Document(page_content=str(i)) for i in range(5))
+
+    create_vector_store(chunks)
+
+    assert len(mock_chroma.call_args.kwargs["documents"]) == 2
+    added = [call.args[0] for call in mock_chroma.return_value.add_documents.call_args_list]
+    assert [len(batch) for batch in added] == [2, 1]
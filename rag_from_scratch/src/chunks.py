@@ -1,38 +1,138 @@
 import logging
 from typing import Callable, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from config import REMOTE_RATIO_MAPPING
 
 logger = logging.getLogger(__name__)
 
+# Columns the chunk sentence is built from; others (salary, salary_currency, ...) are carried through untouched
+TEMPLATE_COLS = [
+    "work_year", "experience_level", "job_title", "employment_type", "employee_residence",
+    "salary_in_usd", "remote_ratio", "company_size", "company_location",
+]
 
-def _serialize_row(row: pd.Series) -> str:
-    salary = row.get("salary_in_usd", 0)
-    salary_str = f"{salary:,}" if isinstance(salary, (int, float)) else str(salary)
 
-    return (
-        f"In {row.get('work_year', 'unknown year')}, "
-        f"a {row.get('experience_level', '')} {row.get('job_title', 'professional')} "
-        f"working {row.get('employment_type', '')} in {row.get('employee_residence', 'unknown location')} "
-        f"earned a salary of {salary_str} USD. "
-        f"The role was {REMOTE_RATIO_MAPPING.get(row.get('remote_ratio', 0), 'on-site')} "
-        f"for a {row.get('company_size', 'unknown')}-sized company "
-        f"located in {row.get('company_location', 'unknown location')}."
-    )
+def _lit(text: str) -> pa.Scalar:
+    return pa.scalar(text, pa.large_string())
+
+
+def _as_text(df: pd.DataFrame, column: str, default: str) -> pa.Array:
+    """Column as an Arrow string array, with the default for missing values or a missing column."""
+    if column not in df:
+        return pa.repeat(_lit(default), len(df))
+    arr = pa.array(df[column])
+    if pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_decode()
+    return pc.fill_null(pc.cast(arr, pa.large_string()), _lit(default))
+
+
+def _group_thousands(values: pa.Array) -> pa.Array:
+    """Formats integers like ``"{:,}"``, one 3-digit group per pass over the column."""
+    magnitude = pc.abs(values)
+    largest = pc.max(magnitude).as_py() or 0
+
+    def group(k):
+        g = pc.cast(pc.divide(magnitude, 1000 ** k) if k else magnitude, pa.int64())
+        return pc.cast(pc.subtract(g, pc.multiply(pc.divide(g, 1000), 1000)), pa.large_string())
+
+    def head(k, text):
+        # Groups below the leading one are zero-padded to three digits
+        if 1000 ** (k + 1) > largest:
+            return text
+        return pc.if_else(pc.greater_equal(magnitude, 1000 ** (k + 1)), pc.utf8_lpad(text, 3, "0"), text)
+
+    result = head(0, group(0))
+    k = 1
+    while 1000 ** k <= largest:
+        joined = pc.binary_join_element_wise(head(k, group(k)), result, _lit(","))
+        result = pc.if_else(pc.greater_equal(magnitude, 1000 ** k), joined, result)
+        k += 1
+    return pc.if_else(pc.less(values, 0), pc.binary_join_element_wise(_lit("-"), result, _lit("")), result)
+
+
+def _format_salary(df: pd.DataFrame) -> pa.Array:
+    if "salary_in_usd" not in df:
+        return pa.repeat(_lit("0"), len(df))
+    salary = df["salary_in_usd"]
+    if pd.api.types.is_integer_dtype(salary) and not pd.api.types.is_bool_dtype(salary):
+        return pc.fill_null(_group_thousands(pc.cast(pa.array(salary), pa.int64())), _lit("0"))
+    texts = [f"{v:,}" if isinstance(v, (int, float)) else str(v) for v in salary.tolist()]
+    return pa.array(texts, pa.large_string())
+
+
+def _serialize_frame(df: pd.DataFrame) -> pa.Array:
+    """Serializes every row into a natural-language salary sentence.
+
+    Each field is converted to an Arrow string column, and the sentence is then
+    concatenated column-wise by Arrow's compiled string kernels, so no Python
+    string object is created per row or per field.
+    """
+    if "remote_ratio" in df:
+        keys = pa.array(list(REMOTE_RATIO_MAPPING))
+        labels = pa.array([*REMOTE_RATIO_MAPPING.values(), "on-site"], pa.large_string())
+        position = pc.index_in(pa.array(df["remote_ratio"]).cast(keys.type, safe=False), value_set=keys)
+        remote = labels.take(pc.fill_null(position, len(keys)))
+    else:
+        remote = pa.repeat(_lit("on-site"), len(df))
+
+    parts = [
+        _lit("In "), _as_text(df, "work_year", "unknown year"),
+        _lit(", a "), _as_text(df, "experience_level", ""),
+        _lit(" "), _as_text(df, "job_title", "professional"),
+        _lit(" working "), _as_text(df, "employment_type", ""),
+        _lit(" in "), _as_text(df, "employee_residence", "unknown location"),
+        _lit(" earned a salary of "), _format_salary(df),
+        _lit(" USD. The role was "), remote,
+        _lit(" for a "), _as_text(df, "company_size", "unknown"),
+        _lit("-sized company located in "), _as_text(df, "company_location", "unknown location"),
+        _lit("."),
+    ]
+    # The last argument is the separator
+    return pc.binary_join_element_wise(*parts, _lit(""))
+
+
+def _dedupe_chunks(df: pd.DataFrame) -> pd.DataFrame:
+    """Keeps the first row per distinct text_chunk and records how many rows it stands for."""
+    # Missing chunks (a chunk_fn returning None) form one group, like duplicated() treats them
+    codes, uniques = pd.factorize(df["text_chunk"], use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    first = ~df["text_chunk"].duplicated().to_numpy()
+    df = df[first].copy()
+    # factorize numbers chunks in order of first appearance, so the kept rows are codes 0..k-1
+    df["row_count"] = counts
+    removed = len(codes) - len(df)
+    if removed:
+        logger.info("Merged %d rows with identical text chunks", removed)
+    return df
 
 
 def create_text_chunks(
     df: pd.DataFrame,
-    chunk_fn: Optional[Callable[[pd.Series], str]] = None
+    chunk_fn: Optional[Callable[[pd.Series], str]] = None,
+    dedupe: bool = True
 ) -> pd.DataFrame:
-    chunk_function = chunk_fn or _serialize_row
-    df = df.copy() 
+    """Adds a text_chunk column. With ``dedupe`` (the default), rows that serialize to
+    the same text are merged so each chunk is embedded and stored once; the
+    ``row_count`` column keeps how many records each chunk represents."""
+    logger.info("Creating text chunks for %d records...", len(df))
+    if chunk_fn is None:
+        # Built column-wise in Arrow from only the columns the sentence uses
+        texts = _serialize_frame(df[[col for col in TEMPLATE_COLS if col in df]])
+        text_chunk = pd.Series(pd.arrays.ArrowExtensionArray(texts), index=df.index)
+    else:
+        text_chunk = df.apply(chunk_fn, axis=1)
+
+    # assign() leaves the caller's frame untouched without deep-copying every column
+    df = df.assign(text_chunk=text_chunk)
 
-    logger.info(f"Creating text chunks for {len(df)} records...")
-    df["text_chunk"] = df.apply(chunk_function, axis=1)
+    if dedupe:
+        df = _dedupe_chunks(df)
 
     if not df.empty:
-        logger.debug(f"Sample chunk: {df['text_chunk'].iloc[0][:100]}...")
+        logger.debug("Sample chunk: %.100s...", df['text_chunk'].iloc[0])
 
     return df
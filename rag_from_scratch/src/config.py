@@ -15,19 +15,59 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 
 # Data file paths
 RAW_SALARIES_PATH = RAW_DATA_DIR / "salaries.csv"
-PROCESSED_SALARIES_PATH = PROCESSED_DATA_DIR / "cleaned_salaries.csv"
+PROCESSED_SALARIES_PATH = PROCESSED_DATA_DIR / "cleaned_salaries.parquet"
 FAISS_INDEX_PATH = PROCESSED_DATA_DIR / "faiss_index.bin"
 
+# Raw CSVs larger than this are ingested block by block instead of all at once
+INGEST_STREAMING_MIN_BYTES = int(os.getenv("INGEST_STREAMING_MIN_BYTES", str(256 * 1024 * 1024)))
+INGEST_BLOCK_SIZE_BYTES = 16 * 1024 * 1024  # ~one block of rows in memory at a time
+
 # --- Model Configuration ---
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384  # Dimension for all-MiniLM-L6-v2
 
+# Opt-in int8 ONNX Runtime embedder for CPU-only machines (needs optimum[onnxruntime])
+ONNX_EMBEDDER = os.getenv("ONNX_EMBEDDER", "0") == "1"
+ONNX_MODEL_DIR = PROCESSED_DATA_DIR / "onnx_embedder"
+
+# int8 vectors differ slightly from fp32 ones, so the encoder is part of every cache key
+EMBEDDING_BACKEND = "onnx-int8" if ONNX_EMBEDDER else "torch"
+
+# Per-row embeddings kept next to the index, so a rebuild only encodes changed chunks
+EMBEDDING_CACHE_DIR = (
+    PROCESSED_DATA_DIR / "embeddings" / f"{EMBEDDING_MODEL_NAME.replace('/', '__')}-{EMBEDDING_BACKEND}"
+)
+
 # LLM Configuration
 DEFAULT_LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-flash")
 LLM_TEMPERATURE = 0  # Deterministic output for grounded answers
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))  # Max in-flight requests for batched answers
+LLM_TIMEOUT_SECONDS = 60
+LLM_MAX_RETRIES = 5  # Retries on rate limits / transient server errors, with exponential backoff
+LLM_BACKOFF_BASE_SECONDS = 1
+LLM_BACKOFF_MAX_SECONDS = 30
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))  # Exact-match answer cache; 0 disables
+
+# Semantic answer cache: reuse answers to paraphrased queries over the same context
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "4096"))  # Answers kept; least recently used evicted first
+SEMANTIC_CACHE_PATH = PROCESSED_DATA_DIR / "semantic_cache.sqlite"
+
+# REST endpoint used when generating through the optional aiohttp transport
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
 
 # --- Retrieval Configuration ---
 DEFAULT_TOP_K = 5  # Number of chunks to retrieve
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))  # Query embeddings / results kept in memory; 0 disables
+
+# Corpora with at least this many chunks get a compressed IVF index instead of an exhaustive fp16 one
+VECTOR_INDEX_MIN_ROWS = int(os.getenv("VECTOR_INDEX_MIN_ROWS", "10000"))
+VECTOR_INDEX_FACTORY = os.getenv("VECTOR_INDEX_FACTORY")  # Overrides the automatic choice
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))  # IVF lists scanned per query (recall vs latency)
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))  # HNSW candidate list per query (recall vs latency)
+FAISS_NUM_THREADS = int(os.getenv("FAISS_NUM_THREADS", "0"))  # OpenMP threads for search; 0 uses every core
+INDEX_RETRAIN_GROWTH = 0.2  # A trained index is updated in place until the corpus grows by more than this
 
 # --- Logging Configuration ---
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -37,8 +77,9 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 def setup_logging() -> None:
     """Configure logging once for the entire application.
 
-    Should be called once from main.py at startup. Individual modules
-    should use ``logging.getLogger(__name__)`` to get their own loggers.
+    Called once, as the first statement of ``main.main()`` rather than at
+    import time. Individual modules should use ``logging.getLogger(__name__)``
+    to get their own loggers.
     """
     logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 
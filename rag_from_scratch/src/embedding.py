@@ -1,39 +1,200 @@
 import logging
-from typing import List, Union
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Union
 
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from config import EMBEDDING_MODEL_NAME
+from config import EMBEDDING_MODEL_NAME, ONNX_EMBEDDER, ONNX_MODEL_DIR, QUERY_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Allow TF32 tensor-core matmuls for any fp32 work on Ampere+ GPUs; no effect on CPU
+torch.set_float32_matmul_precision("high")
+
+# Chunks are one short sentence per salary row, so 128 tokens never truncates them
+MAX_SEQ_LENGTH = 128
+GPU_BATCH_SIZE = 256
+CPU_BATCH_SIZE = 64
+
+
+class _OnnxEncoder:
+    """Dynamically int8-quantized ONNX export of the model, run with ONNX Runtime on CPU.
+
+    The export and quantization happen once and are cached under ``ONNX_MODEL_DIR``.
+    Pooling and normalization mirror sentence-transformers' mean-pooling models.
+    """
+
+    def __init__(self, model_name: str, max_seq_length: int = MAX_SEQ_LENGTH) -> None:
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        quantized_dir = ONNX_MODEL_DIR / "int8"
+
+        if not quantized_dir.is_dir():
+            logger.info("Exporting %s to int8 ONNX (one-time)...", hub_name)
+            export_dir = ONNX_MODEL_DIR / "fp32"
+            ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True).save_pretrained(export_dir)
+            ORTQuantizer.from_pretrained(export_dir).quantize(
+                save_dir=quantized_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            quantized_dir, file_name="model_quantized.onnx", session_options=options
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(hub_name)
+        self.dimension = self.model.config.hidden_size
+        self.max_seq_length = max_seq_length
+
+    def _tokenize(self, batch: List[str]):
+        return self.tokenizer(
+            batch,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+
+    def _tokenized(self, batches: List[List[str]]) -> Iterator:
+        """Yields the tokenized batches in order. The next batch is tokenized on a
+        worker thread while the caller runs the model on the current one; the Rust
+        tokenizer and ONNX Runtime both release the GIL, so the two overlap."""
+        if len(batches) <= 1:
+            yield from map(self._tokenize, batches)
+            return
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self._tokenize, batches[0])
+            for batch in batches[1:]:
+                inputs = pending.result()
+                pending = pool.submit(self._tokenize, batch)
+                yield inputs
+            yield pending.result()
+
+    def encode(self, texts: List[str], batch_size: int, normalize: bool) -> np.ndarray:
+        # Batch texts of similar length together so little of each batch is padding,
+        # then put the vectors back in input order (as sentence-transformers does)
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        texts = [texts[i] for i in order]
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        vectors = []
+        for inputs in self._tokenized(batches):
+            hidden = np.asarray(self.model(**inputs).last_hidden_state, dtype=np.float32)
+            mask = inputs["attention_mask"].astype(np.float32)
+            # Masked token sum as one batched matmul, without a (batch, tokens, dim) temporary
+            pooled = np.matmul(mask[:, None, :], hidden)[:, 0, :]
+            if normalize:
+                # L2 normalisation cancels the mean's 1/n_tokens, so it is folded into one scale
+                scale = np.sqrt(np.einsum("ij,ij->i", pooled, pooled))
+            else:
+                scale = mask.sum(axis=1)
+            pooled /= np.clip(scale, 1e-12, None)[:, None]
+            vectors.append(pooled)
+        if not vectors:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        out[order] = np.concatenate(vectors)
+        return out
+
 
 class Embedder:
 
-    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, device: Union[str, None] = None) -> None:
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        device: Union[str, None] = None,
+        use_onnx: bool = ONNX_EMBEDDER,
+        batch_size: Union[int, None] = None,
+        max_seq_length: int = MAX_SEQ_LENGTH
+    ) -> None:
+        # Default batch size for encode(); None picks GPU_BATCH_SIZE or CPU_BATCH_SIZE
+        self.batch_size = batch_size
+        self.query_cache_size = QUERY_CACHE_SIZE
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_lock = threading.Lock()
+        self.onnx = None
+        if use_onnx:
+            self.onnx = _OnnxEncoder(model_name, max_seq_length)
+            self.on_gpu = False
+            logger.info("Embedder loaded with ONNX Runtime (int8, CPU)")
+            return
+
         self.model = SentenceTransformer(model_name, device=device)
+        self.model.max_seq_length = max_seq_length
+        self.on_gpu = self.model.device.type == "cuda"
+        if self.on_gpu:
+            # FP16 halves memory traffic and runs the matmuls on tensor cores
+            self.model.half()
+        logger.info("Embedder loaded on %s (%s)", self.model.device, "fp16" if self.on_gpu else "fp32")
 
     def encode(
         self,
         texts: Union[str, List[str]],
         show_progress: bool = True,
         normalize: bool = True,
-        batch_size: int = 32
+        batch_size: Union[int, None] = None
     ) -> np.ndarray:
         if isinstance(texts, str):
             texts = [texts]
+        if batch_size is None:
+            batch_size = self.batch_size or (GPU_BATCH_SIZE if self.on_gpu else CPU_BATCH_SIZE)
 
-        embeddings = self.model.encode(
-            texts,
-            show_progress_bar=show_progress,
-            batch_size=batch_size,
-            normalize_embeddings=normalize,
-        )
+        if self.onnx is not None:
+            return self.onnx.encode(texts, batch_size, normalize)
+
+        # inference_mode skips autograd's version counters and view tracking entirely
+        with torch.inference_mode():
+            embeddings = self.model.encode(
+                texts,
+                show_progress_bar=show_progress,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize,
+            )
+
+        # FAISS expects float32; this is a no-op on CPU and upcasts fp16 GPU output
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Normalized query embeddings, served from an LRU of recent queries.
 
-        return np.array(embeddings, dtype="float32", copy=False)
+        Retrieval and the semantic answer cache both embed the user's question,
+        and repeated questions are common, so only unseen queries reach the model.
+        """
+        out = np.empty((len(queries), self.dimension), dtype=np.float32)
+        missing = {}
+        with self._query_lock:
+            for i, query in enumerate(queries):
+                vector = self._query_cache.get(query)
+                if vector is None:
+                    missing.setdefault(query, []).append(i)
+                else:
+                    self._query_cache.move_to_end(query)
+                    out[i] = vector
+        if missing:
+            vectors = self.encode(list(missing), show_progress=False)
+            with self._query_lock:
+                for vector, (query, rows) in zip(vectors, missing.items()):
+                    out[rows] = vector
+                    if self.query_cache_size > 0:
+                        self._query_cache[query] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return out
 
     @property
     def dimension(self) -> int:
+        if self.onnx is not None:
+            return self.onnx.dimension
         return self.model.get_sentence_embedding_dimension()
 
 
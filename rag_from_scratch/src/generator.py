@@ -1,10 +1,22 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.request
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterator, List, Optional
 import google.generativeai as genai
 from config import (
-    DEFAULT_LLM_MODEL, LLM_TEMPERATURE, 
-    GEMINI_API_KEY
+    DEFAULT_LLM_MODEL, LLM_TEMPERATURE, LLM_CONCURRENCY, LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS,
+    GEMINI_API_KEY, GEMINI_API_BASE, RESPONSE_CACHE_SIZE, EMBEDDING_MODEL_NAME,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_PATH, SEMANTIC_CACHE_SIZE
 )
+from semantic_cache import SemanticCache, context_hash
 
 import logging
 logger = logging.getLogger(__name__)
@@ -15,29 +27,218 @@ class GenerationError(Exception):
     pass
 
 
+# Rate limiting and transient server-side failures
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_delay(exc: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying `exc`, or None if it isn't transient.
+
+    Honors a Retry-After header when the error carries one; otherwise backs
+    off exponentially with full jitter.
+    """
+    # google.api_core and urllib errors expose the HTTP status as `code`, aiohttp's
+    # as `status`. urllib's HTTPError is also an OSError, so a status decides alone;
+    # only status-less connection resets and timeouts are retried as OSErrors
+    status = getattr(exc, "code", None) or getattr(exc, "status", None)
+    if status is not None:
+        if status not in _RETRYABLE_STATUS:
+            return None
+    elif not isinstance(exc, (OSError, asyncio.TimeoutError)):
+        return None
+    headers = getattr(exc, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _call_with_retries(fn: Callable, max_retries: int = LLM_MAX_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries:
+                raise
+            logger.warning("Transient LLM error (%s); retrying in %.1fs", e, delay)
+            time.sleep(delay)
+
+
+async def _acall_with_retries(fn: Callable, max_retries: int = LLM_MAX_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries:
+                raise
+            logger.warning("Transient LLM error (%s); retrying in %.1fs", e, delay)
+            await asyncio.sleep(delay)
+
+
+# Byte-identical across calls and sent as the system instruction, ahead of the
+# variable context/question, so the provider's prompt-prefix cache can reuse it
+_INSTRUCTION_PREFIX = (
+    "Answer the question ONLY using the provided context.\n"
+    "If the answer is not in the context, say: 'I don't have enough data to answer that.'"
+)
+
+
+@lru_cache(maxsize=256)
+def _join_context(context_chunks: tuple) -> str:
+    """Joins retrieved chunks once per distinct context. Follow-up questions and
+    the cache-key/prompt pair of a single call reuse the same top-k chunks, and
+    str hashes are memoized, so a repeat lookup costs O(k) rather than a fresh
+    copy of the whole context."""
+    return "\n---\n".join(context_chunks)
+
+
 class BaseGenerator(ABC):
     @abstractmethod
     def generate_answer(self, query: str, context_chunks: List[str], **kwargs) -> str:
         pass
 
+    def generate_answers(self, queries: List[str], contexts_list: List[List[str]], **kwargs) -> List[str]:
+        """Answers several queries; by default one call per query."""
+        return [self.generate_answer(q, c, **kwargs) for q, c in zip(queries, contexts_list)]
+
+    def warm_up(self) -> None:
+        """Opens any network connection ahead of the first question (no-op by default)."""
+
+    async def agenerate_answer(self, query: str, context_chunks: List[str], **kwargs) -> str:
+        """Async variant; by default runs the sync method in a worker thread."""
+        return await asyncio.to_thread(self.generate_answer, query, context_chunks, **kwargs)
+
+    async def agenerate_answers(
+        self,
+        queries: List[str],
+        contexts_list: List[List[str]],
+        concurrency: int = LLM_CONCURRENCY,
+        **kwargs
+    ) -> List[str]:
+        """Answers many queries concurrently, with at most `concurrency` requests in flight."""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(query: str, context_chunks: List[str]) -> str:
+            async with sem:
+                return await self.agenerate_answer(query, context_chunks, **kwargs)
+
+        return await asyncio.gather(*(one(q, c) for q, c in zip(queries, contexts_list)))
+
+
+# Process-wide client state, shared by every GeminiGenerator instance
+_configured_api_key = None
+_configure_lock = threading.Lock()
+_session = None
+_session_loop = None
+_session_closer = None
+
+
+def _configure(api_key: str) -> None:
+    """Configures the SDK once per API key. genai.configure() discards the cached
+    service clients, so calling it per instance would reopen the channel (and
+    redo the TLS handshake) for every new generator."""
+    global _configured_api_key
+    with _configure_lock:
+        if api_key != _configured_api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
+
+async def _close_on_shutdown(session) -> AsyncIterator[None]:
+    """Parked at its yield for the life of the loop. asyncio.run() finalizes async
+    generators before closing the loop, so the session is closed on its own loop."""
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+def _get_session():
+    """The shared keep-alive aiohttp session for the current event loop."""
+    global _session, _session_loop, _session_closer
+    # aiohttp sessions are bound to the event loop they were created in
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=100, keepalive_timeout=60)
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT_SECONDS, connect=5),
+        )
+        _session_loop = loop
+        # Starting the generator on this loop registers it for the loop's shutdown;
+        # dropping the previous one lets its loop (if still alive) close that session
+        _session_closer = _close_on_shutdown(_session)
+        loop.create_task(_session_closer.__anext__())
+    return _session
+
+
+async def _close_session() -> None:
+    global _session, _session_closer
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_closer = None
+
 
 class GeminiGenerator(BaseGenerator):
+    """Gemini-backed generator.
+
+    With ``use_aio_transport=True`` the async path skips the SDK and POSTs to the
+    REST ``generateContent`` endpoint over one process-wide, keep-alive ``aiohttp``
+    session, which sustains much higher concurrency than per-call channels.
+    Requires the optional ``aiohttp`` dependency; call ``aclose()`` to release
+    the shared session when done.
+    """
 
-    def __init__(self, model: str, api_key: str) -> None:
+    def __init__(self, model: str, api_key: str, use_aio_transport: bool = False) -> None:
         self.model = model
-        genai.configure(api_key=api_key)
-        self.gemini_model = genai.GenerativeModel(self.model)
-        logger.info(f"Initialized Gemini model: {self.model}")
+        self._api_key = api_key
+        self.use_aio_transport = use_aio_transport
+        _configure(api_key)
+        self.gemini_model = genai.GenerativeModel(self.model, system_instruction=_INSTRUCTION_PREFIX)
+        logger.info("Initialized Gemini model: %s", self.model)
 
-    def generate_answer(self, query: str, context_chunks: List[str], temperature: float = LLM_TEMPERATURE) -> str:
-        if not context_chunks:
-            return "I don't have enough data to answer that."
+    @staticmethod
+    def _request_body(prompt: str, temperature: float) -> dict:
+        """A REST `GenerateContentRequest` body for one prompt."""
+        return {
+            "systemInstruction": {"parts": [{"text": _INSTRUCTION_PREFIX}]},
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": temperature},
+        }
+
+    async def _apost(self, prompt: str, temperature: float) -> str:
+        url = f"{GEMINI_API_BASE}/models/{self.model}:generateContent"
+        payload = self._request_body(prompt, temperature)
+        async with _get_session().post(
+            url, json=payload, headers={"x-goog-api-key": self._api_key}
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return data["candidates"][0]["content"]["parts"][0]["text"]
 
-        context_text = "\n---\n".join(context_chunks)
-        prompt = f"""Answer the question ONLY using the provided context.
-If the answer is not in the context, say: 'I don't have enough data to answer that.'
+    async def aclose(self) -> None:
+        await _close_session()
+
+    def warm_up(self) -> None:
+        # count_tokens is free and goes through the same cached service client as
+        # generate_content, so it opens the channel and TLS session without a completion
+        try:
+            self.gemini_model.count_tokens("ping")
+        except Exception as e:
+            logger.debug("Generator warm-up failed: %s", e)
 
-CONTEXT:
+    @staticmethod
+    def _build_prompt(query: str, context_chunks: List[str]) -> str:
+        context_text = _join_context(tuple(context_chunks))
+        return f"""CONTEXT:
 {context_text}
 
 QUESTION:
@@ -45,29 +246,412 @@ QUESTION:
 
 ANSWER:"""
 
+    @staticmethod
+    def _build_batch_prompt(queries: List[str], contexts_list: List[List[str]]) -> str:
+        items = [
+            f"Q{i}:\nCONTEXT:\n{_join_context(tuple(context_chunks))}\nQUESTION:\n{query}"
+            for i, (query, context_chunks) in enumerate(zip(queries, contexts_list), 1)
+        ]
+        return (
+            "Each question below has its own context; answer each ONLY from that context.\n"
+            f"Return a JSON array of exactly {len(queries)} strings, one answer per question, in order.\n\n"
+            + "\n\n".join(items)
+        )
+
+    def generate_answers(
+        self,
+        queries: List[str],
+        contexts_list: List[List[str]],
+        batch_size: int = 8,
+        temperature: float = LLM_TEMPERATURE
+    ) -> List[str]:
+        """Answers up to `batch_size` questions per request, amortizing the request
+        overhead and the instructions across them. Batches whose reply can't be
+        parsed are retried one question at a time."""
+        answers = ["I don't have enough data to answer that."] * len(queries)
+        pending = [i for i, context_chunks in enumerate(contexts_list) if context_chunks]
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            batch_answers = None
+            if len(batch) > 1:
+                batch_answers = self._generate_batch(
+                    [queries[i] for i in batch], [contexts_list[i] for i in batch], temperature
+                )
+            if batch_answers is None:
+                batch_answers = [self.generate_answer(queries[i], contexts_list[i], temperature=temperature) for i in batch]
+            for i, answer in zip(batch, batch_answers):
+                answers[i] = answer
+        return answers
+
+    def _generate_batch(self, queries: List[str], contexts_list: List[List[str]], temperature: float) -> Optional[List[str]]:
         try:
-            response = self.gemini_model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(temperature=temperature)
-            )
+            response = _call_with_retries(lambda: self.gemini_model.generate_content(
+                self._build_batch_prompt(queries, contexts_list),
+                generation_config=genai.types.GenerationConfig(
+                    temperature=temperature,
+                    response_mime_type="application/json"
+                ),
+                request_options={"timeout": LLM_TIMEOUT_SECONDS}
+            ))
+            answers = json.loads(response.text)
+        except Exception as e:
+            logger.warning("Batched generation failed (%s); answering one by one", e)
+            return None
+        if not isinstance(answers, list) or len(answers) != len(queries):
+            logger.warning("Batched generation returned a malformed reply; answering one by one")
+            return None
+        return [str(answer).strip() for answer in answers]
+
+    def generate_answer(self, query: str, context_chunks: List[str], temperature: float = LLM_TEMPERATURE) -> str:
+        if not context_chunks:
+            return "I don't have enough data to answer that."
+
+        try:
+            response = _call_with_retries(lambda: self.gemini_model.generate_content(
+                self._build_prompt(query, context_chunks),
+                generation_config=genai.types.GenerationConfig(temperature=temperature),
+                request_options={"timeout": LLM_TIMEOUT_SECONDS}
+            ))
             return response.text.strip()
         except Exception as e:
             logger.exception("Error during Gemini generation")
             raise GenerationError(f"Gemini generation failed: {e}") from e
 
+    def stream_answer(self, query: str, context_chunks: List[str], temperature: float = LLM_TEMPERATURE) -> Iterator[str]:
+        """Yields the answer piece by piece as Gemini generates it, so callers can
+        render the first tokens without waiting for the full completion. Only
+        opening the stream is retried; a failure mid-stream raises GenerationError."""
+        if not context_chunks:
+            yield "I don't have enough data to answer that."
+            return
+
+        try:
+            response = _call_with_retries(lambda: self.gemini_model.generate_content(
+                self._build_prompt(query, context_chunks),
+                generation_config=genai.types.GenerationConfig(temperature=temperature),
+                request_options={"timeout": LLM_TIMEOUT_SECONDS},
+                stream=True
+            ))
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.exception("Error during streamed Gemini generation")
+            raise GenerationError(f"Gemini generation failed: {e}") from e
+
+    async def astream_answer(self, query: str, context_chunks: List[str], temperature: float = LLM_TEMPERATURE) -> AsyncIterator[str]:
+        if not context_chunks:
+            yield "I don't have enough data to answer that."
+            return
+
+        try:
+            response = await _acall_with_retries(lambda: self.gemini_model.generate_content_async(
+                self._build_prompt(query, context_chunks),
+                generation_config=genai.types.GenerationConfig(temperature=temperature),
+                request_options={"timeout": LLM_TIMEOUT_SECONDS},
+                stream=True
+            ))
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.exception("Error during streamed async Gemini generation")
+            raise GenerationError(f"Gemini generation failed: {e}") from e
+
+    async def agenerate_answer(self, query: str, context_chunks: List[str], temperature: float = LLM_TEMPERATURE) -> str:
+        if not context_chunks:
+            return "I don't have enough data to answer that."
+
+        prompt = self._build_prompt(query, context_chunks)
+        try:
+            if self.use_aio_transport:
+                return (await _acall_with_retries(lambda: self._apost(prompt, temperature))).strip()
+            # Native async call: concurrent requests share the SDK's pooled async transport
+            response = await _acall_with_retries(lambda: self.gemini_model.generate_content_async(
+                prompt,
+                generation_config=genai.types.GenerationConfig(temperature=temperature),
+                request_options={"timeout": LLM_TIMEOUT_SECONDS}
+            ))
+            return response.text.strip()
+        except Exception as e:
+            logger.exception("Error during async Gemini generation")
+            raise GenerationError(f"Gemini generation failed: {e}") from e
+
+    def _rest(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        request = urllib.request.Request(
+            f"{GEMINI_API_BASE}/{path}",
+            data=json.dumps(payload).encode() if payload is not None else None,
+            headers={"x-goog-api-key": self._api_key, "Content-Type": "application/json"},
+            method=method,
+        )
+        with urllib.request.urlopen(request, timeout=LLM_TIMEOUT_SECONDS) as resp:
+            return json.load(resp)
+
+    def submit_batch(
+        self,
+        queries: List[str],
+        contexts_list: List[List[str]],
+        temperature: float = LLM_TEMPERATURE
+    ) -> str:
+        """Submits the queries as one asynchronous Gemini batch job and returns its
+        name. Batch jobs are billed at a discount and don't count against the
+        interactive rate limit, at the cost of up to 24h turnaround."""
+        requests = [
+            {
+                "request": self._request_body(self._build_prompt(query, context_chunks), temperature),
+                "metadata": {"key": str(i)},
+            }
+            for i, (query, context_chunks) in enumerate(zip(queries, contexts_list))
+        ]
+        body = {
+            "batch": {
+                "display_name": f"rag-batch-{len(requests)}",
+                "input_config": {"requests": {"requests": requests}},
+            }
+        }
+        try:
+            batch_name = _call_with_retries(lambda: self._rest("POST", f"models/{self.model}:batchGenerateContent", body))["name"]
+        except Exception as e:
+            logger.exception("Error submitting Gemini batch")
+            raise GenerationError(f"Gemini batch submission failed: {e}") from e
+        logger.info("Submitted Gemini batch %s with %d requests", batch_name, len(requests))
+        return batch_name
+
+    def poll_batch(self, batch_name: str) -> Optional[List[str]]:
+        """Returns the answers of a finished batch in submission order, or None
+        while it is still running. Requests that failed individually, or whose
+        response is missing, get an empty answer in their position."""
+        try:
+            batch = _call_with_retries(lambda: self._rest("GET", batch_name))
+        except Exception as e:
+            raise GenerationError(f"Gemini batch poll failed: {e}") from e
+
+        state = batch.get("metadata", {}).get("state", "")
+        if state in ("BATCH_STATE_PENDING", "BATCH_STATE_RUNNING"):
+            return None
+        if state != "BATCH_STATE_SUCCEEDED":
+            raise GenerationError(f"Gemini batch {batch_name} ended in state {state or 'UNKNOWN'}")
+
+        responses = batch.get("response", {}).get("inlinedResponses", {}).get("inlinedResponses", [])
+        by_index = {}
+        for position, item in enumerate(responses):
+            # Results carry the metadata key they were submitted with
+            index = int(item.get("metadata", {}).get("key", position))
+            try:
+                by_index[index] = item["response"]["candidates"][0]["content"]["parts"][0]["text"].strip()
+            except (KeyError, IndexError):
+                logger.warning("Batch request %d failed: %s", index, item.get("error"))
+
+        # Sized by what was submitted, so a response the service left out can't shift the others
+        request_count = int(batch["metadata"].get("batchStats", {}).get("requestCount", 0))
+        n = max(request_count, len(responses), max(by_index, default=-1) + 1)
+        if len(responses) < n:
+            logger.warning("Batch %s returned %d of %d responses", batch_name, len(responses), n)
+        answers = [by_index.get(i, "") for i in range(n)]
+        return answers
+
+
+class ResponseCache:
+    """In-process LRU of answers keyed on (model, temperature, prompt)."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, temperature: float, prompt: str) -> str:
+        # The prompt already embeds the instructions, context and query
+        return hashlib.blake2b(f"{model}|{temperature}|{prompt}".encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        logger.info("Response cache hit (%d hits / %d misses)", self.hits, self.misses)
+        return answer
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class Generator(BaseGenerator):
 
-    def __init__(self, model: str = DEFAULT_LLM_MODEL, api_key: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        model: str = DEFAULT_LLM_MODEL,
+        api_key: Optional[str] = None,
+        use_aio_transport: bool = False,
+        cache_size: int = RESPONSE_CACHE_SIZE,
+        embedder=None,
+        semantic_cache_path=SEMANTIC_CACHE_PATH
+    ) -> None:
         key = api_key or GEMINI_API_KEY
         if not key:
             logger.error("GEMINI_API_KEY is missing")
             raise ValueError("GEMINI_API_KEY is required")
             
-        self._impl = GeminiGenerator(model, key)
+        self._impl = GeminiGenerator(model, key, use_aio_transport=use_aio_transport)
+        self._cache = ResponseCache(cache_size) if cache_size > 0 else None
+
+        # The semantic layer reuses the retrieval encoder to embed queries
+        self._embedder = embedder
+        self._semantic_cache = None
+        if embedder is not None and SEMANTIC_CACHE_ENABLED:
+            self._semantic_cache = SemanticCache(
+                embedder.dimension,
+                namespace=f"{model}|{EMBEDDING_MODEL_NAME}",
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                db_path=semantic_cache_path,
+                max_entries=SEMANTIC_CACHE_SIZE
+            )
+
+        # Exact-cache key -> task for async requests that are still running
+        self._inflight = {}
+
+    def _cache_key(self, query: str, context_chunks: List[str], kwargs) -> Optional[str]:
+        # Sampled answers (temperature > 0) are meant to vary, so they are never reused
+        temperature = kwargs.get("temperature", LLM_TEMPERATURE)
+        if self._cache is None or not context_chunks or temperature > 0:
+            return None
+        prompt = self._impl._build_prompt(query, context_chunks)
+        return ResponseCache.key(self._impl.model, temperature, prompt)
+
+    def _lookup(self, query: str, context_chunks: List[str], kwargs):
+        """Returns (cached answer or None, exact key, (query vector, context hash) or None)."""
+        key = self._cache_key(query, context_chunks, kwargs)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached, key, None
+
+        semantic = None
+        temperature = kwargs.get("temperature", LLM_TEMPERATURE)
+        if self._semantic_cache is not None and context_chunks and temperature <= 0:
+            semantic = (self._embedder.encode_queries([query])[0], context_hash(context_chunks))
+            cached = self._semantic_cache.get(*semantic)
+            if cached is not None:
+                if key is not None:
+                    self._cache.put(key, cached)
+                return cached, key, semantic
+        return None, key, semantic
+
+    def _store(self, key, semantic, answer: str) -> None:
+        if key is not None:
+            self._cache.put(key, answer)
+        if semantic is not None:
+            self._semantic_cache.put(*semantic, answer)
 
     def generate_answer(self, query: str, context_chunks: List[str], **kwargs) -> str:
-        return self._impl.generate_answer(query, context_chunks, **kwargs)
+        cached, key, semantic = self._lookup(query, context_chunks, kwargs)
+        if cached is not None:
+            return cached
+        answer = self._impl.generate_answer(query, context_chunks, **kwargs)
+        self._store(key, semantic, answer)
+        return answer
+
+    def generate_answers(self, queries: List[str], contexts_list: List[List[str]], **kwargs) -> List[str]:
+        """Answers many queries, packing the exact-cache misses into batched requests."""
+        answers = [None] * len(queries)
+        keys = []
+        misses = []
+        for i, (query, context_chunks) in enumerate(zip(queries, contexts_list)):
+            key = self._cache_key(query, context_chunks, kwargs)
+            keys.append(key)
+            cached = self._cache.get(key) if key is not None else None
+            if cached is not None:
+                answers[i] = cached
+            else:
+                misses.append(i)
+
+        if misses:
+            generated = self._impl.generate_answers(
+                [queries[i] for i in misses], [contexts_list[i] for i in misses], **kwargs
+            )
+            for i, answer in zip(misses, generated):
+                answers[i] = answer
+                if keys[i] is not None:
+                    self._cache.put(keys[i], answer)
+        return answers
+
+    def stream_answer(self, query: str, context_chunks: List[str], **kwargs) -> Iterator[str]:
+        """Streams the answer; a cache hit is yielded as a single piece and a
+        completed stream is stored like any other answer."""
+        cached, key, semantic = self._lookup(query, context_chunks, kwargs)
+        if cached is not None:
+            yield cached
+            return
+        pieces = []
+        for piece in self._impl.stream_answer(query, context_chunks, **kwargs):
+            pieces.append(piece)
+            yield piece
+        self._store(key, semantic, "".join(pieces).strip())
+
+    async def astream_answer(self, query: str, context_chunks: List[str], **kwargs) -> AsyncIterator[str]:
+        cached, key, semantic = self._lookup(query, context_chunks, kwargs)
+        if cached is not None:
+            yield cached
+            return
+        pieces = []
+        async for piece in self._impl.astream_answer(query, context_chunks, **kwargs):
+            pieces.append(piece)
+            yield piece
+        self._store(key, semantic, "".join(pieces).strip())
+
+    async def _agenerate_and_store(self, query: str, context_chunks: List[str], key, semantic, kwargs) -> str:
+        answer = await self._impl.agenerate_answer(query, context_chunks, **kwargs)
+        self._store(key, semantic, answer)
+        return answer
+
+    async def agenerate_answer(self, query: str, context_chunks: List[str], **kwargs) -> str:
+        cached, key, semantic = self._lookup(query, context_chunks, kwargs)
+        if cached is not None:
+            return cached
+        if key is None:
+            return await self._agenerate_and_store(query, context_chunks, key, semantic, kwargs)
+
+        # Identical concurrent requests share one LLM call: the first starts it,
+        # the rest await the same task. No await separates the check from the
+        # insert, so this is race-free on a single event loop.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._agenerate_and_store(query, context_chunks, key, semantic, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the call the others await
+        return await asyncio.shield(task)
+
+    def submit_batch(self, queries: List[str], contexts_list: List[List[str]], **kwargs) -> str:
+        return self._impl.submit_batch(queries, contexts_list, **kwargs)
+
+    def poll_batch(self, batch_name: str) -> Optional[List[str]]:
+        return self._impl.poll_batch(batch_name)
+
+    def warm_up(self) -> None:
+        self._impl.warm_up()
+
+    async def aclose(self) -> None:
+        await self._impl.aclose()
+
+    async def __aenter__(self) -> "Generator":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
 
 
 class LocalAdvisor(BaseGenerator):
@@ -76,11 +660,11 @@ class LocalAdvisor(BaseGenerator):
         if not context_chunks:
             return "I don't have enough data in my local knowledge base to answer that."
             
-        summary = "Based on my semantic search, here are the key facts:\n"
-        for chunk in context_chunks[:max_chunks]:
-            summary += f"• {chunk}\n"
-        summary += "\n[Note: This answer was generated by the LocalAdvisor fallback.]"
-        return summary
+        parts = ["Based on my semantic search, here are the key facts:"]
+        parts.extend(f"• {chunk}" for chunk in context_chunks[:max_chunks])
+        parts.append("")
+        parts.append("[Note: This answer was generated by the LocalAdvisor fallback.]")
+        return "\n".join(parts)
 
 
 if __name__ == "__main__":
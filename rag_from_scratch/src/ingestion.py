@@ -1,31 +1,67 @@
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from chunks import create_text_chunks
 from config import (
     RAW_SALARIES_PATH, PROCESSED_SALARIES_PATH,
+    INGEST_STREAMING_MIN_BYTES, INGEST_BLOCK_SIZE_BYTES,
     EXPERIENCE_MAPPING, EMPLOYMENT_MAPPING, COMPANY_SIZE_MAPPING,
 )
 
 logger = logging.getLogger(__name__)
 
+# Columns that identify a salary record; duplicates are detected on these only
+NATURAL_KEY_COLS = [
+    "work_year", "job_title", "experience_level",
+    "employee_residence", "salary_in_usd", "company_location",
+]
+
 
 def load_data(file_path: Optional[str] = None) -> pd.DataFrame:
     path = file_path or str(RAW_SALARIES_PATH)
-    logger.info(f"Loading data from {path}")
-    df = pd.read_csv(path)
-    logger.info(f"Loaded {len(df)} records")
+    logger.info("Loading data from %s", path)
+    # The pyarrow engine parses multi-threaded; Arrow-backed columns need less memory than object ones
+    df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    logger.info("Loaded %d records", len(df))
     return df
 
 
+def load_processed_data(file_path: Optional[str] = None) -> pd.DataFrame:
+    path = Path(file_path or str(PROCESSED_SALARIES_PATH))
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, engine="pyarrow", dtype_backend="pyarrow")
+    return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+
+
+def _rename_codes(series: pd.Series, mapping: dict) -> pd.Series:
+    """Maps short codes to labels as a Categorical, renaming only the few categories.
+
+    Codes missing from the mapping keep their value. If a label already occurs as a
+    raw value, renaming would create a duplicate category, so fall back to an element-wise map.
+    """
+    cat = series.astype("category")
+    categories = set(cat.cat.categories)
+    renames = {code: label for code, label in mapping.items() if code in categories}
+    if categories.isdisjoint(renames.values()):
+        return cat.cat.rename_categories(renames)
+    return series.map(mapping).fillna(series).astype("category")
+
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Drops duplicate records (hash-based drop_duplicates on the natural key)
+    and replaces the short codes with readable labels."""
     before = len(df)
-    df = df.drop_duplicates().reset_index(drop=True)
+    subset = [col for col in NATURAL_KEY_COLS if col in df] or None
+    df = df.drop_duplicates(subset=subset, ignore_index=True)
     removed = before - len(df)
     if removed:
-        logger.info(f"Removed {removed} duplicate records")
+        logger.info("Removed %d duplicate records", removed)
 
     for col, mapping in {
         'experience_level': EXPERIENCE_MAPPING,
@@ -33,9 +69,9 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         'company_size': COMPANY_SIZE_MAPPING
     }.items():
         if col in df:
-            df[col] = df[col].map(mapping).fillna(df[col])
+            df[col] = _rename_codes(df[col], mapping)
 
-    logger.info(f"Data cleaning complete: {len(df)} records")
+    logger.info("Data cleaning complete: %d records", len(df))
     return df
 
 
@@ -43,18 +79,98 @@ def save_processed_data(df: pd.DataFrame, output_path: Optional[str] = None) ->
     path = Path(output_path or str(PROCESSED_SALARIES_PATH))
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    df.to_csv(path, index=False)
-    logger.info(f"Processed data saved to {path} ({len(df)} records)")
+    if path.suffix == ".parquet":
+        df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        # Arrow's CSV writer is columnar and releases the GIL, unlike DataFrame.to_csv
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+    logger.info("Processed data saved to %s (%d records)", path, len(df))
     return str(path)
 
 
-def run_ingestion(raw_path: Optional[str] = None, processed_path: Optional[str] = None) -> pd.DataFrame:
+def iter_data(file_path: Optional[str] = None, block_size: int = INGEST_BLOCK_SIZE_BYTES) -> Iterator[pd.DataFrame]:
+    """Yields the raw CSV as DataFrames of roughly `block_size` bytes each.
+
+    The column types are inferred from the first block and enforced on the rest,
+    so every block has the same schema.
+    """
+    path = file_path or str(RAW_SALARIES_PATH)
+    logger.info("Streaming data from %s", path)
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=block_size))
+    for batch in reader:
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _drop_seen(df: pd.DataFrame, seen: set) -> pd.DataFrame:
+    """Drops rows whose natural key occurred in this block or an earlier one."""
+    subset = [col for col in NATURAL_KEY_COLS if col in df] or list(df.columns)
+    hashes = pd.util.hash_pandas_object(df[subset], index=False).to_numpy()
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    keep &= np.fromiter((h not in seen for h in hashes), dtype=bool, count=len(hashes))
+    seen.update(hashes[keep].tolist())
+    return df[keep].reset_index(drop=True)
+
+
+def ingest_streaming(
+    raw_path: Optional[str] = None,
+    processed_path: Optional[str] = None,
+    block_size: int = INGEST_BLOCK_SIZE_BYTES
+) -> int:
+    """Cleans, chunks and writes the raw CSV one block at a time, so peak memory is
+    about one block rather than several copies of the whole file. Duplicates are
+    detected across blocks through a set of natural-key hashes.
+
+    Returns the number of records written.
+    """
+    path = Path(processed_path or str(PROCESSED_SALARIES_PATH))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    seen = set()
+    writer = schema = None
+    written = 0
+    try:
+        for block in iter_data(raw_path, block_size):
+            df = create_text_chunks(clean_data(_drop_seen(block, seen)))
+            if df.empty:
+                continue
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                if path.suffix == ".parquet":
+                    writer = pq.ParquetWriter(path, schema, compression="zstd")
+                else:
+                    writer = pacsv.CSVWriter(path, schema)
+            # Categorical columns may pick a different dictionary index width per block
+            writer.write_table(table.cast(schema))
+            written += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    logger.info("Processed data saved to %s (%d records)", path, written)
+    return written
+
+
+def run_ingestion(
+    raw_path: Optional[str] = None,
+    processed_path: Optional[str] = None,
+    streaming: Optional[bool] = None
+) -> pd.DataFrame:
+    """Runs load -> clean -> chunk -> save. By default, raw files of at least
+    INGEST_STREAMING_MIN_BYTES are processed block by block and the compact
+    processed output is read back."""
     logger.info("--- Starting Data Ingestion Pipeline ---")
 
-    df = load_data(raw_path)
-    df = clean_data(df)
-    df = create_text_chunks(df)
-    save_processed_data(df, processed_path)
+    raw = raw_path or str(RAW_SALARIES_PATH)
+    if streaming is None:
+        streaming = Path(raw).stat().st_size >= INGEST_STREAMING_MIN_BYTES
+
+    if streaming:
+        ingest_streaming(raw, processed_path)
+        df = load_processed_data(processed_path)
+    else:
+        df = load_data(raw)
+        df = clean_data(df)
+        df = create_text_chunks(df)
+        save_processed_data(df, processed_path)
 
     logger.info("--- Data Ingestion Complete ---")
     return df
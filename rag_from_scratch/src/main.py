@@ -1,74 +1,233 @@
 import hashlib
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
-from ingestion import run_ingestion
+from ingestion import run_ingestion, load_processed_data, save_processed_data
 from embedding import Embedder
-from vector_store import VectorStore
+from vector_store import VectorStore, choose_index_factory
 from pipeline import RAGPipeline
 from config import (
     LOG_FORMAT, LOG_LEVEL,
     PROCESSED_SALARIES_PATH, FAISS_INDEX_PATH, RAW_SALARIES_PATH,
-    EMBEDDING_DIMENSION, setup_logging
+    EMBEDDING_DIMENSION, EMBEDDING_BACKEND, EMBEDDING_CACHE_DIR, INDEX_RETRAIN_GROWTH, setup_logging
 )
 
 load_dotenv()
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
 def _file_hash(path) -> str:
-    """Return the MD5 hex digest of a file for staleness detection."""
-    h = hashlib.md5()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    """Return a content digest of a file for staleness detection.
+
+    Uses BLAKE3 (SIMD, multithreaded over an mmap) when the optional ``blake3``
+    package is installed, otherwise SHA-256, which runs on the CPU's SHA
+    extensions and is about twice as fast as MD5 there. The algorithm is part of
+    the digest so switching between them invalidates the index instead of
+    comparing unlike hashes. Only equality matters, so 128 bits are kept.
+    """
+    try:
+        from blake3 import blake3
+    except ImportError:
+        h = hashlib.sha256()
+        buf = bytearray(1 << 20)
+        view = memoryview(buf)
+        with open(path, "rb", buffering=0) as f:
+            while n := f.readinto(buf):
+                h.update(view[:n])
+        return f"sha256:{h.hexdigest()[:32]}"
+    return f"blake3:{blake3(max_threads=blake3.AUTO).update_mmap(path).hexdigest()[:32]}"
 
 
 HASH_SIDECAR = FAISS_INDEX_PATH.with_suffix(".hash")
+# Row hashes of exactly the vectors in the saved index, in index order
+INDEX_ROWS_PATH = FAISS_INDEX_PATH.with_suffix(".rows.npy")
+
+
+def _index_fingerprint(csv_path) -> str:
+    """Identify the data and the encoder an index was built from."""
+    return f"{EMBEDDING_BACKEND}:{_file_hash(csv_path)}"
 
 
 def _index_is_stale(csv_path) -> bool:
-    """Return True if the FAISS index does not match the current CSV."""
+    """Return True if the FAISS index does not match the current CSV and encoder."""
     if not HASH_SIDECAR.exists():
         return True
     stored = HASH_SIDECAR.read_text().strip()
-    return stored != _file_hash(csv_path)
+    return stored != _index_fingerprint(csv_path)
+
+
+def _indexed_row_hashes() -> Optional[np.ndarray]:
+    """Row hashes of the saved index, or None if it can't be updated in place.
+
+    The fingerprint is written last when an index is saved, so a missing one
+    means an interrupted save; an index built by another encoder can't be reused.
+    """
+    if not (HASH_SIDECAR.exists() and INDEX_ROWS_PATH.exists()):
+        return None
+    backend = HASH_SIDECAR.read_text().strip().split(":", 1)[0]
+    if backend != EMBEDDING_BACKEND:
+        logger.info("Saved index was built with the %s encoder — rebuilding.", backend)
+        return None
+    return np.load(INDEX_ROWS_PATH)
+
+
+def _save_array(path, array: np.ndarray) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _save_index(store: VectorStore, hashes: np.ndarray) -> None:
+    """Saves the index with its row hashes and fingerprint as one unit.
+
+    The fingerprint is removed first and rewritten last, so a crash part-way
+    leaves an index that is treated as stale rather than one that looks current.
+    """
+    HASH_SIDECAR.unlink(missing_ok=True)
+    store.save(str(FAISS_INDEX_PATH))
+    _save_array(INDEX_ROWS_PATH, hashes)
+    tmp = HASH_SIDECAR.with_suffix(".tmp")
+    tmp.write_text(_index_fingerprint(PROCESSED_SALARIES_PATH))
+    os.replace(tmp, HASH_SIDECAR)
+
+
+VECTORS_PATH = EMBEDDING_CACHE_DIR / "embeddings.npy"
+ROW_HASHES_PATH = EMBEDDING_CACHE_DIR / "row_hashes.npy"
+
+
+def _row_hashes(texts: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy(dtype=np.uint64)
+
+
+def _embed_chunks(embedder: Embedder, texts: pd.Series) -> np.ndarray:
+    """Embeds the chunks, reusing vectors stored by the previous build.
+
+    Rows are matched on a 64-bit hash of their text, so only chunks that are new
+    or changed since the last build are encoded. The matrix and its row hashes
+    are then saved for the next rebuild.
+    """
+    hashes = _row_hashes(texts)
+
+    missing = np.ones(len(texts), dtype=bool)
+    embeddings = np.empty((len(texts), embedder.dimension), dtype=np.float32)
+    if VECTORS_PATH.exists() and ROW_HASHES_PATH.exists():
+        old_hashes = np.load(ROW_HASHES_PATH)
+        old_vectors = np.load(VECTORS_PATH, mmap_mode="r")
+        if len(old_hashes) and old_vectors.shape == (len(old_hashes), embedder.dimension):
+            sorter = np.argsort(old_hashes)
+            pos = np.minimum(np.searchsorted(old_hashes, hashes, sorter=sorter), len(old_hashes) - 1)
+            found = old_hashes[sorter[pos]] == hashes
+            embeddings[found] = old_vectors[sorter[pos[found]]]
+            missing = ~found
+        del old_vectors  # release the mapping before the file is replaced
+
+    n_missing = int(missing.sum())
+    logger.info("Embedding %d of %d chunks (%d reused)", n_missing, len(texts), len(texts) - n_missing)
+    if n_missing:
+        # Encode each distinct text once and scatter it back to every row that repeats it
+        rows = np.flatnonzero(missing)
+        _, first, inverse = np.unique(hashes[rows], return_index=True, return_inverse=True)
+        embeddings[rows] = embedder.encode(texts.iloc[rows[first]].tolist())[inverse]
+
+    EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # float16 halves the cache on disk; the index keeps fp16 or coarser codes anyway
+    _save_array(VECTORS_PATH, embeddings.astype(np.float16))
+    _save_array(ROW_HASHES_PATH, hashes)
+    return embeddings
+
+
+def _load_index() -> Optional[VectorStore]:
+    """Return the saved index, or None if it is missing or stale."""
+    if not FAISS_INDEX_PATH.exists():
+        return None
+    if _index_is_stale(PROCESSED_SALARIES_PATH):
+        logger.warning("FAISS index is stale — rebuilding.")
+        return None
+    store = VectorStore(dimension=EMBEDDING_DIMENSION)
+    store.load(str(FAISS_INDEX_PATH))
+    return store
+
+
+def _update_index(embeddings: np.ndarray, hashes: np.ndarray, old_hashes: Optional[np.ndarray]) -> Optional[VectorStore]:
+    """Brings the stale saved index up to date in place, or returns None if it
+    has to be rebuilt.
+
+    When the corpus only gained rows at the end, just those are added. Otherwise
+    the vectors are re-added while the trained quantizer is kept, so an IVF-PQ
+    index skips its training step. It is retrained once the corpus has grown by
+    more than INDEX_RETRAIN_GROWTH, or when its size calls for another index type.
+    """
+    if old_hashes is None or not FAISS_INDEX_PATH.exists():
+        return None
+    store = VectorStore(dimension=EMBEDDING_DIMENSION)
+    store.load(str(FAISS_INDEX_PATH), mmap=False)
+    n_old = len(old_hashes)
+    if store.size != n_old or store.is_flat != (choose_index_factory(len(hashes)) is None):
+        return None
+    if not store.is_flat and len(hashes) > n_old * (1 + INDEX_RETRAIN_GROWTH):
+        return None
+
+    if len(hashes) >= n_old and np.array_equal(hashes[:n_old], old_hashes):
+        logger.info("Adding %d new chunks to the existing index", len(hashes) - n_old)
+        if len(hashes) > n_old:
+            store.add(embeddings[n_old:])
+    else:
+        logger.info("Re-adding %d chunks to the existing index", len(hashes))
+        store.reset()
+        store.add(embeddings)
+    return store
 
 
 def initialize_system() -> RAGPipeline:
-    """Initialize the RAG system components and orchestrator."""
+    """Initialize the RAG system components and orchestrator.
+
+    The model load, the data load and the index load (with its staleness hash)
+    are independent, so they run concurrently; only a rebuild needs all three.
+    """
     logger.info("Initializing system...")
     
-    if not PROCESSED_SALARIES_PATH.exists():
-        logger.info("Ingesting raw data...")
-        df = run_ingestion()
-    else:
-        df = pd.read_csv(PROCESSED_SALARIES_PATH)
-    
-    embedder = Embedder()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        embedder_future = pool.submit(Embedder)
+        # The staleness check hashes the processed file, so it can only start once that exists
+        index_future = pool.submit(_load_index) if PROCESSED_SALARIES_PATH.exists() else None
+
+        legacy_csv = PROCESSED_SALARIES_PATH.with_suffix(".csv")
+        if PROCESSED_SALARIES_PATH.exists():
+            df = load_processed_data()
+        elif legacy_csv.exists():
+            # Convert a CSV left by an older version once, so later starts skip the parse
+            logger.info("Converting %s to Parquet...", legacy_csv)
+            df = load_processed_data(str(legacy_csv))
+            save_processed_data(df)
+        else:
+            logger.info("Ingesting raw data...")
+            df = run_ingestion()
+
+        embedder = embedder_future.result()
+        store = index_future.result() if index_future is not None else None
 
     # Validate that config dimension matches the model
     assert embedder.dimension == EMBEDDING_DIMENSION, (
         f"Model dimension ({embedder.dimension}) != config EMBEDDING_DIMENSION ({EMBEDDING_DIMENSION})"
     )
 
-    store = VectorStore(dimension=embedder.dimension)
-    
-    if not FAISS_INDEX_PATH.exists() or _index_is_stale(PROCESSED_SALARIES_PATH):
-        if FAISS_INDEX_PATH.exists():
-            logger.warning("FAISS index is stale — rebuilding.")
-        logger.info("Building knowledge base index...")
-        embeddings = embedder.encode(df['text_chunk'].tolist())
-        store.add(embeddings)
-        store.save(str(FAISS_INDEX_PATH))
-        HASH_SIDECAR.write_text(_file_hash(PROCESSED_SALARIES_PATH))
-    else:
-        store.load(str(FAISS_INDEX_PATH))
+    if store is None:
+        hashes = _row_hashes(df['text_chunk'])
+        embeddings = _embed_chunks(embedder, df['text_chunk'])
+        store = _update_index(embeddings, hashes, _indexed_row_hashes())
+        if store is None:
+            logger.info("Building knowledge base index...")
+            store = VectorStore(dimension=embedder.dimension, index_factory=choose_index_factory(len(df)))
+            store.add(embeddings)
+        _save_index(store, hashes)
     
     return RAGPipeline(embedder, store, df)
 
@@ -80,11 +239,14 @@ def handle_query(advisor: RAGPipeline) -> None:
         
     print("Searching...")
     try:
-        result = advisor.run(query)
-        print(f"\nResponse:\n{result['answer']}")
+        result = advisor.run_stream(query)
+        print("\nResponse:")
+        for piece in result['answer']:
+            print(piece, end="", flush=True)
+        print()
         print(f"\n[Source: {result['source']} | Chunks used: {len(result['context'])}]")
     except Exception as e:
-        logger.error(f"Query error: {e}")
+        logger.error("Query error: %s", e)
         print(f"Error: {e}")
 
 def handle_insight_report(advisor: RAGPipeline) -> None:
@@ -101,7 +263,7 @@ def handle_insight_report(advisor: RAGPipeline) -> None:
         print(result['report'])
         print(f"\n[Based on {result['num_records_analyzed']} records]")
     except Exception as e:
-        logger.error(f"Insight error: {e}")
+        logger.error("Insight error: %s", e)
         print(f"Error: {e}")
 
 def run_interactive_session(advisor: RAGPipeline) -> None:
@@ -131,6 +293,8 @@ Main Menu:
 
 def main() -> int:
     """Main entry point."""
+    # Configure the root logger here, once, rather than as an import side effect
+    setup_logging()
     print("\nAI Career Advisor (RAG)")
     print("-" * 23)
     
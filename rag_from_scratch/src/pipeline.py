@@ -1,6 +1,8 @@
 import logging
-from typing import Dict, List, Any
+import threading
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from embedding import Embedder
@@ -11,6 +13,28 @@ from config import DEFAULT_TOP_K, DEFAULT_LLM_MODEL
 
 logger = logging.getLogger(__name__)
 
+_NO_RESULTS_ANSWER = "I couldn't find any relevant information in the knowledge base."
+
+# The retrieved chunks reach the model through the generator's CONTEXT section,
+# so the request itself carries only the instructions
+_INSIGHT_TEMPLATE = """Summarize the salary records in the context into a high-level Career Insight Report for: {job_title}
+
+Include:
+1. Typical Salary Range (min, max, average if apparent)
+2. Most common location/remote status patterns
+3. Experience levels represented
+4. A practical tip for candidates applying for this role
+
+Format your response clearly with bullet points or sections."""
+
+
+def _salary_stats(salaries: np.ndarray) -> Tuple[float, float, float]:
+    """Min, max and mean of the finite values in a float64 salary array."""
+    salaries = salaries[np.isfinite(salaries)]
+    if not salaries.size:
+        return float("nan"), float("nan"), float("nan")
+    return float(salaries.min()), float(salaries.max()), float(salaries.mean())
+
 
 class RAGPipeline:
    
@@ -23,11 +47,36 @@ class RAGPipeline:
     ) -> None:
 
         self.retriever = Retriever(embedder, vector_store, data)
-        self.generator = Generator(model=model)
+        self.generator = Generator(model=model, embedder=embedder)
         self.fallback = LocalAdvisor()
         self.model = model
+        # Connect to the LLM in the background while the user types the first question
+        threading.Thread(target=self.generator.warm_up, daemon=True).start()
         
-        logger.info(f"RAGPipeline initialized with model: {model}")
+        logger.info("RAGPipeline initialized with model: %s", model)
+
+    @classmethod
+    def from_components(
+        cls,
+        retriever: Retriever,
+        generator: BaseGenerator,
+        fallback: Optional[LocalAdvisor] = None,
+        model: str = DEFAULT_LLM_MODEL
+    ) -> "RAGPipeline":
+        """Assemble a pipeline from ready-made parts, without building a Generator
+        or starting its warm-up thread."""
+        embedder_dim = retriever.embedder.dimension
+        if embedder_dim != retriever.vector_store.dimension:
+            raise ValueError(
+                f"Embedder dimension ({embedder_dim}) != vector store dimension "
+                f"({retriever.vector_store.dimension})"
+            )
+        pipeline = cls.__new__(cls)
+        pipeline.retriever = retriever
+        pipeline.generator = generator
+        pipeline.fallback = fallback if fallback is not None else LocalAdvisor()
+        pipeline.model = model
+        return pipeline
 
     def run(
         self, 
@@ -38,17 +87,17 @@ class RAGPipeline:
 
         logger.info("=" * 50)
         logger.info("Pipeline Execution Started")
-        logger.info(f"Query: {query}")
+        logger.info("Query: %s", query)
 
         # 1. Retrieval Phase
-        logger.info(f"Retrieving top {k} context chunks...")
+        logger.info("Retrieving top %d context chunks...", k)
         retrieval_results = self.retriever.search(query, k=k)
         
         if not retrieval_results:
             logger.warning("No relevant documents found")
             return {
                 "query": query,
-                "answer": "I couldn't find any relevant information in the knowledge base.",
+                "answer": _NO_RESULTS_ANSWER,
                 "context": [],
                 "scores": [],
                 "source": "no_results"
@@ -57,9 +106,10 @@ class RAGPipeline:
         context_chunks = [res['text'] for res in retrieval_results]
         scores = [res['score'] for res in retrieval_results]
 
-        # Log retrieved chunks for transparency
-        for i, res in enumerate(retrieval_results):
-            logger.debug(f"Chunk {i+1} (Score: {res['score']:.4f}): {res['text'][:80]}...")
+        # Log retrieved chunks for transparency; skip the loop entirely below DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, res in enumerate(retrieval_results):
+                logger.debug("Chunk %d (Score: %.4f): %.80s...", i + 1, res['score'], res['text'])
 
         # 2. Generation Phase (with exception-based fallback)
         logger.info("Generating grounded answer...")
@@ -68,13 +118,13 @@ class RAGPipeline:
             answer = self.generator.generate_answer(query, context_chunks)
         except GenerationError as e:
             if use_fallback:
-                logger.warning(f"LLM failed: {e}. Switching to LocalAdvisor.")
+                logger.warning("LLM failed: %s. Switching to LocalAdvisor.", e)
                 answer = self.fallback.generate_answer(query, context_chunks)
                 source = "fallback"
             else:
                 raise
 
-        logger.info(f"Answer generated via: {source}")
+        logger.info("Answer generated via: %s", source)
         logger.info("Pipeline Execution Finished")
         logger.info("=" * 50)
 
@@ -86,13 +136,113 @@ class RAGPipeline:
             "source": source
         }
 
+    def run_stream(
+        self,
+        query: str,
+        k: int = DEFAULT_TOP_K,
+        use_fallback: bool = True
+    ) -> Dict[str, Any]:
+        """Like :meth:`run`, but ``answer`` is an iterator of text pieces that yields
+        the reply while the LLM is still generating it. ``source`` is final once
+        the iterator is exhausted: it becomes "fallback" if the stream can't be opened."""
+        logger.info("Streaming query: %s", query)
+        retrieval_results = self.retriever.search(query, k=k)
+        if not retrieval_results:
+            logger.warning("No relevant documents found")
+            return {
+                "query": query,
+                "answer": iter([_NO_RESULTS_ANSWER]),
+                "context": [],
+                "scores": [],
+                "source": "no_results"
+            }
+
+        context_chunks = [res['text'] for res in retrieval_results]
+        result = {
+            "query": query,
+            "answer": None,
+            "context": context_chunks,
+            "scores": [res['score'] for res in retrieval_results],
+            "source": "llm"
+        }
+        result["answer"] = self._stream_answer(query, context_chunks, use_fallback, result)
+        return result
+
+    def _stream_answer(
+        self,
+        query: str,
+        context_chunks: List[str],
+        use_fallback: bool,
+        result: Dict[str, Any]
+    ) -> Iterator[str]:
+        started = False
+        try:
+            for piece in self.generator.stream_answer(query, context_chunks):
+                started = True
+                yield piece
+        except GenerationError as e:
+            # Text already shown can't be taken back, so only a failed start falls back
+            if started or not use_fallback:
+                raise
+            logger.warning("LLM failed: %s. Switching to LocalAdvisor.", e)
+            result["source"] = "fallback"
+            yield self.fallback.generate_answer(query, context_chunks)
+
+    def run_many(
+        self,
+        queries: List[str],
+        k: int = DEFAULT_TOP_K,
+        use_fallback: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Answers several queries at once: retrieval is a single batched encode
+        and FAISS search, and generation packs the questions into batched LLM
+        requests. Results come back in query order, shaped like :meth:`run`'s."""
+        logger.info("Batch execution started for %d queries", len(queries))
+        retrieval_results = self.retriever.search_many(queries, k=k)
+
+        answered = [i for i, results in enumerate(retrieval_results) if results]
+        contexts = {i: [res['text'] for res in retrieval_results[i]] for i in answered}
+        answers, source = {}, "llm"
+        if answered:
+            try:
+                generated = self.generator.generate_answers(
+                    [queries[i] for i in answered], [contexts[i] for i in answered]
+                )
+                answers = dict(zip(answered, generated))
+            except GenerationError as e:
+                if not use_fallback:
+                    raise
+                logger.warning("LLM failed: %s. Switching to LocalAdvisor.", e)
+                answers = {i: self.fallback.generate_answer(queries[i], contexts[i]) for i in answered}
+                source = "fallback"
+
+        output = []
+        for i, query in enumerate(queries):
+            if i not in answers:
+                output.append({
+                    "query": query,
+                    "answer": _NO_RESULTS_ANSWER,
+                    "context": [],
+                    "scores": [],
+                    "source": "no_results"
+                })
+                continue
+            output.append({
+                "query": query,
+                "answer": answers[i],
+                "context": contexts[i],
+                "scores": [res['score'] for res in retrieval_results[i]],
+                "source": source
+            })
+        return output
+
     def get_salary_insight(
         self, 
         job_title: str,
         k: int = 5
     ) -> Dict[str, Any]:
 
-        logger.info(f"Generating Salary Insight Report for: {job_title}")
+        logger.info("Generating Salary Insight Report for: %s", job_title)
         
         # Retrieve relevant salary data (retriever only — no LLM call here)
         query = f"What is the average salary and common remote work status for {job_title}?"
@@ -107,26 +257,21 @@ class RAGPipeline:
                 "num_records_analyzed": 0
             }
 
-        # Generate a structured insight report
-        insight_prompt = f"""Summarize the following data into a high-level Career Insight Report for: {job_title}
-
-Include:
-1. Typical Salary Range (min, max, average if apparent)
-2. Most common location/remote status patterns
-3. Experience levels represented
-4. A practical tip for candidates applying for this role
-
-Format your response clearly with bullet points or sections.
-
-CONTEXT:
-{chr(10).join(context_chunks)}
-"""
+        # Generate a structured insight report; repeats are served by the generator's caches
+        insight_prompt = _INSIGHT_TEMPLATE.format(job_title=job_title)
         
         try:
             report = self.generator.generate_answer(insight_prompt, context_chunks)
         except GenerationError:
             logger.warning("Falling back to LocalAdvisor for insight report")
-            report = self._generate_local_insight(job_title, context_chunks)
+            data = self.retriever.data
+            salaries = None
+            if "salary_in_usd" in data:
+                rows = [res['index'] for res in retrieval_results]
+                salaries = pd.to_numeric(data["salary_in_usd"].iloc[rows], errors="coerce").to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+            report = self._generate_local_insight(job_title, context_chunks, salaries)
         
         return {
             "job_title": job_title,
@@ -138,7 +283,8 @@ CONTEXT:
     def _generate_local_insight(
         self, 
         job_title: str, 
-        context_chunks: List[str]
+        context_chunks: List[str],
+        salaries: Optional[np.ndarray] = None
     ) -> str:
         """Generate a simple insight report locally when LLM is unavailable."""
         report = f"## Career Insight Report: {job_title}\n\n"
@@ -147,6 +293,12 @@ CONTEXT:
         for chunk in context_chunks[:5]:
             report += f"• {chunk}\n"
         
+        if salaries is not None:
+            low, high, mean = _salary_stats(salaries)
+            if not np.isnan(mean):
+                report += "\n### Salary Range (USD):\n"
+                report += f"Min {low:,.0f} · Max {high:,.0f} · Average {mean:,.0f}\n"
+        
         report += "\n### Summary:\n"
         report += f"Based on {len(context_chunks)} relevant records found in the database.\n"
         report += "\n[Note: Detailed analysis requires LLM access. This is a simplified local report.]"
@@ -1,10 +1,13 @@
 import logging
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Callable, Optional
 
+import numpy as np
 import pandas as pd
 from embedding import Embedder
 from vector_store import VectorStore
-from config import DEFAULT_TOP_K
+from config import DEFAULT_TOP_K, QUERY_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,10 @@ logger = logging.getLogger(__name__)
 MIN_SCORE_THRESHOLD = 0.25
 
 
+def _base_score(text: str, base_score: float, idx: int) -> float:
+    return base_score
+
+
 class Retriever:
     """Performs semantic search over stored document chunks.
 
@@ -38,20 +45,65 @@ class Retriever:
         self.vector_store = vector_store
         self.data = data
         self.text_column = text_column
-        self.score_fn = score_fn or (lambda text, base_score, idx: base_score)
+        # Plain object arrays: indexing one per hit is far cheaper than DataFrame.iloc
+        self._texts = data[text_column].to_numpy(dtype=object)
+        self._columns: Dict[str, np.ndarray] = {}
+        self.score_fn = score_fn or _base_score
         self.min_score = min_score
+        # Recent (query, k, index size) -> results; the size invalidates entries when vectors are added
+        self.cache_size = QUERY_CACHE_SIZE
+        self._results: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
 
     def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
         """Return up to *k* chunks whose similarity exceeds ``min_score``."""
-        query_vector = self.embedder.encode([query], show_progress=False)
-        scores, indices = self.vector_store.search(query_vector, k)
+        return self.search_many([query], k)[0]
+
+    def search_many(self, queries: List[str], k: int = DEFAULT_TOP_K) -> List[List[Dict[str, Any]]]:
+        """Like :meth:`search` for several queries, with one encode and one FAISS search.
+
+        FAISS only parallelizes across the queries of a batch, and the embedder
+        amortizes its forward pass the same way.
+        """
+        size = self.vector_store.size
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        missing = {}
+        with self._lock:
+            for i, query in enumerate(queries):
+                cached = self._results.get((query, k, size))
+                if cached is None:
+                    missing.setdefault(query, []).append(i)
+                else:
+                    self._results.move_to_end((query, k, size))
+                    results[i] = list(cached)
 
+        if missing:
+            query_vectors = self.embedder.encode_queries(list(missing))
+            scores, indices = self.vector_store.search(query_vectors, k)
+            with self._lock:
+                for row, (query, positions) in enumerate(missing.items()):
+                    found = self._collect(scores[row], indices[row])
+                    for i in positions:
+                        results[i] = list(found)
+                    if self.cache_size > 0:
+                        self._results[(query, k, size)] = found
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return results
+
+    def _collect(self, scores, indices) -> List[Dict[str, Any]]:
+        if self.score_fn is _base_score:
+            # FAISS returns hits best-first, so without re-scoring the threshold
+            # is a single cut-off over the score row instead of a test per hit
+            keep = int(np.count_nonzero(scores >= self.min_score))
+            scores, indices = scores[:keep], indices[:keep]
         results = []
-        for i, idx in enumerate(indices[0]):
-            if idx == -1 or idx >= len(self.data):
+        texts, n_texts = self._texts, len(self._texts)
+        for i, idx in enumerate(indices):
+            if idx < 0 or idx >= n_texts:
                 continue
-            text = self.data.iloc[idx][self.text_column]
-            score = self.score_fn(text, float(scores[0][i]), idx)
+            text = texts[idx]
+            score = self.score_fn(text, float(scores[i]), idx)
             if score < self.min_score:
                 continue
             results.append({"text": text, "score": score, "index": int(idx)})
@@ -66,14 +118,17 @@ class Retriever:
     ) -> List[Dict[str, Any]]:
         results = self.search(query, k)
 
-        if metadata_columns:
-            for result in results:
-                idx = result["index"]
-                for col in metadata_columns:
-                    if col in self.data.columns and col != self.text_column:
-                        result[col] = self.data.iloc[idx][col]
-
-        return results
+        columns = [col for col in metadata_columns or [] if col in self.data.columns and col != self.text_column]
+        if not columns:
+            return results
+        for col in columns:
+            if col not in self._columns:
+                self._columns[col] = self.data[col].to_numpy(dtype=object)
+        # New dicts, so the cached search results are left untouched
+        return [
+            {**result, **{col: self._columns[col][result["index"]] for col in columns}}
+            for result in results
+        ]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+import faiss
+import numpy as np
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def context_hash(context_chunks: List[str]) -> str:
+    return hashlib.blake2b("\n---\n".join(context_chunks).encode(), digest_size=16).hexdigest()
+
+
+class SemanticCache:
+    """Answer cache keyed on query embeddings.
+
+    A lookup is a nearest-neighbour search over the embeddings of previously
+    answered queries. It hits only when the similarity clears ``threshold``
+    *and* the answer was produced from the same retrieved context, so a
+    paraphrase is only reused when it is grounded on identical facts.
+    At most ``max_entries`` answers are kept; the least recently used one is
+    evicted first. Entries are optionally persisted to SQLite and the newest
+    ``max_entries`` are reloaded on start-up.
+    """
+
+    # Neighbours checked per lookup, so a paraphrase grounded on another context
+    # at rank 1 doesn't hide a valid match behind it
+    SEARCH_K = 8
+
+    def __init__(
+        self,
+        dimension: int,
+        namespace: str,
+        threshold: float = 0.92,
+        db_path: Optional[Union[str, Path]] = None,
+        max_entries: int = 4096
+    ) -> None:
+        self.dimension = dimension
+        self.namespace = namespace
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.index = faiss.IndexFlatIP(dimension)
+        self._answers: List[str] = []
+        self._context_hashes: List[str] = []
+        self._rowids: List[Optional[int]] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path is not None:
+            self._open(Path(db_path))
+
+    def _open(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache ("
+            "namespace TEXT NOT NULL, vec BLOB NOT NULL, answer TEXT NOT NULL, context_hash TEXT NOT NULL)"
+        )
+        rows = self._conn.execute(
+            "SELECT rowid, vec, answer, context_hash FROM semantic_cache WHERE namespace = ? "
+            "ORDER BY rowid DESC LIMIT ?",
+            (self.namespace, self.max_entries)
+        ).fetchall()[::-1]
+        if rows:
+            with self._conn:
+                # Entries beyond the cap were evicted by an earlier process
+                self._conn.execute(
+                    "DELETE FROM semantic_cache WHERE namespace = ? AND rowid < ?", (self.namespace, rows[0][0])
+                )
+            vectors = np.stack([np.frombuffer(vec, dtype=np.float32) for _, vec, _, _ in rows])
+            self.index.add(vectors)
+            self._rowids = [rowid for rowid, _, _, _ in rows]
+            self._answers = [answer for _, _, answer, _ in rows]
+            self._context_hashes = [ctx for _, _, _, ctx in rows]
+            self._last_used = list(range(len(rows)))
+            self._clock = len(rows)
+            logger.info("Loaded %d semantic cache entries", len(rows))
+
+    @staticmethod
+    def _as_query(query_vec: np.ndarray) -> np.ndarray:
+        q = np.ascontiguousarray(query_vec, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(q)
+        return q
+
+    def _touch(self, row: int) -> None:
+        self._clock += 1
+        self._last_used[row] = self._clock
+
+    def _evict_lru(self) -> None:
+        row = int(np.argmin(self._last_used))
+        # Removing from a flat index shifts later rows down, like the list pops below
+        self.index.remove_ids(np.array([row], dtype=np.int64))
+        del self._answers[row], self._context_hashes[row], self._last_used[row]
+        rowid = self._rowids.pop(row)
+        if self._conn is not None and rowid is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM semantic_cache WHERE rowid = ?", (rowid,))
+
+    def get(self, query_vec: np.ndarray, ctx_hash: str) -> Optional[str]:
+        q = self._as_query(query_vec)
+        with self._lock:
+            answer = None
+            if self.index.ntotal:
+                scores, indices = self.index.search(q, min(self.SEARCH_K, self.index.ntotal))
+                for score, row in zip(scores[0], indices[0]):
+                    if score < self.threshold:
+                        break
+                    if self._context_hashes[row] == ctx_hash:
+                        answer = self._answers[row]
+                        self._touch(int(row))
+                        break
+            if answer is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        logger.info("Semantic cache hit (%d hits / %d misses)", self.hits, self.misses)
+        return answer
+
+    def put(self, query_vec: np.ndarray, ctx_hash: str, answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        q = self._as_query(query_vec)
+        with self._lock:
+            rowid = None
+            if self._conn is not None:
+                with self._conn:
+                    rowid = self._conn.execute(
+                        "INSERT INTO semantic_cache VALUES (?, ?, ?, ?)",
+                        (self.namespace, q.tobytes(), answer, ctx_hash)
+                    ).lastrowid
+            self.index.add(q)
+            self._answers.append(answer)
+            self._context_hashes.append(ctx_hash)
+            self._rowids.append(rowid)
+            self._last_used.append(0)
+            self._touch(len(self._answers) - 1)
+            while self.index.ntotal > self.max_entries:
+                self._evict_lru()
+
+    def __len__(self) -> int:
+        return self.index.ntotal
@@ -1,38 +1,164 @@
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 import faiss
 import numpy as np
+from config import (
+    VECTOR_INDEX_MIN_ROWS, VECTOR_INDEX_FACTORY, FAISS_NPROBE, FAISS_EF_SEARCH, FAISS_NUM_THREADS
+)
+
+# Batched searches are split across OpenMP threads. Query encoding and search
+# run one after the other, so by default FAISS gets every core; lower
+# FAISS_NUM_THREADS when other work shares the machine.
+faiss.omp_set_num_threads(FAISS_NUM_THREADS or os.cpu_count() or 1)
+
+# Share of the corpus used to train IVF centroids / PQ codebooks, with a floor
+# of ~40 points per centroid and per PQ code
+TRAIN_FRACTION = 0.1
+MIN_TRAIN_POINTS_PER_CENTROID = 40
+
+
+def choose_index_factory(n_vectors: int) -> Optional[str]:
+    """FAISS factory string for a corpus of this size, or None to keep the exhaustive fp16 index.
+
+    Large corpora get PQ codes (32 bytes per vector instead of 4*d) in an IVF
+    whose coarse quantizer is itself an HNSW graph, so a query scans ``nprobe``
+    lists rather than every vector. Prefixing "OPQ32," via VECTOR_INDEX_FACTORY
+    buys some recall for a much longer training step, "HNSW32,Flat" selects
+    an uncompressed graph index (no training, log-time search, more memory) and
+    "SQ8" an exhaustive int8 index that scans half the bytes of the fp16 default
+    (recall@10 ~0.98 against exact search on unit vectors).
+    """
+    if VECTOR_INDEX_FACTORY:
+        return VECTOR_INDEX_FACTORY
+    if n_vectors < VECTOR_INDEX_MIN_ROWS:
+        return None
+    # ~4*sqrt(N) lists, rounded to the nearest power of two
+    nlist = 1 << int(round(np.log2(4 * np.sqrt(n_vectors))))
+    return f"IVF{nlist}_HNSW32,PQ32"
 
 
 class VectorStore:
 
-    def __init__(self, dimension: int) -> None:
+    def __init__(
+        self,
+        dimension: int,
+        index_factory: Optional[str] = None,
+        nprobe: int = FAISS_NPROBE,
+        ef_search: int = FAISS_EF_SEARCH
+    ) -> None:
         self.dimension = dimension
-        self.index = faiss.IndexFlatIP(dimension)
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.read_only = False
+        if index_factory:
+            self.index = faiss.index_factory(dimension, index_factory, faiss.METRIC_INNER_PRODUCT)
+            self._apply_search_params()
+        else:
+            # Exhaustive search over fp16 codes: half the bytes scanned per query of
+            # IndexFlatIP, with scores within ~1e-4 on unit vectors
+            self.index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+
+    def _apply_search_params(self) -> None:
+        # efSearch applies to HNSW indexes and to the HNSW coarse quantizer of an IVF
+        params = faiss.ParameterSpace()
+        for name, value in (("nprobe", self.nprobe), ("efSearch", self.ef_search)):
+            try:
+                params.set_index_parameter(self.index, name, value)
+            except RuntimeError:
+                pass  # parameter does not apply to this index type
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Trains the index on a random sample of `vectors` (no-op for flat indexes)."""
+        if self.index.is_trained:
+            return
+        try:
+            nlist = faiss.extract_index_ivf(self.index).nlist
+        except RuntimeError:
+            nlist = 1
+        n_train = min(len(vectors), max(int(len(vectors) * TRAIN_FRACTION), MIN_TRAIN_POINTS_PER_CENTROID * max(nlist, 256)))
+        sample = np.random.default_rng(0).choice(len(vectors), size=n_train, replace=False)
+        self.index.train(np.ascontiguousarray(vectors[np.sort(sample)]))
 
     def add(self, vectors: np.ndarray) -> None:
-        vectors = vectors.astype('float32', copy=False)
-        if vectors.shape[1] != self.dimension:
-            raise ValueError(f"Vector dimension mismatch: expected {self.dimension}, got {vectors.shape[1]}")
+        """Adds vectors after L2-normalizing them, so inner product is cosine similarity.
+
+        Like ``faiss.normalize_L2``, this works in place when `vectors` is already
+        a C-contiguous float32 array.
+        """
+        vectors = self._as_matrix(vectors)
+        self._check_writable()
+        faiss.normalize_L2(vectors)
+        self.train(vectors)
         self.index.add(vectors)
 
-    def search(self, query_vectors: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
-        query_vectors = query_vectors.astype('float32', copy=False)
-        scores, indices = self.index.search(query_vectors, k)
+    def _as_matrix(self, vectors: np.ndarray) -> np.ndarray:
+        """The (n, dimension) C-contiguous float32 array FAISS reads without copying."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension mismatch: expected (n, {self.dimension}), got {vectors.shape}")
+        return vectors
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("Index is memory-mapped read-only; load it with mmap=False to modify it")
+
+    def reset(self) -> None:
+        """Removes all vectors but keeps any trained centroids / codebooks."""
+        self._check_writable()
+        self.index.reset()
+
+    def search(self, query_vectors: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k inner-product search. ``nprobe`` overrides the IVF lists scanned
+        for this call only (ignored by exhaustive indexes)."""
+        query_vectors = self._as_matrix(query_vectors)
+        params = None
+        if nprobe is not None and not self.is_flat:
+            params = faiss.SearchParametersIVF(nprobe=nprobe)
+        scores, indices = self.index.search(query_vectors, k, params=params)
         return scores, indices
 
     def save(self, path: str) -> None:
         p = Path(path)
         p.parent.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(self.index, str(p))
+        # Write beside the target and swap it in, so a process that has the old
+        # file memory-mapped keeps reading a complete index
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        faiss.write_index(self.index, str(tmp))
+        os.replace(tmp, p)
 
-    def load(self, path: str) -> None:
+    def load(self, path: str, mmap: bool = True) -> None:
+        """Loads an index written by :meth:`save`.
+
+        With ``mmap`` the vectors / inverted lists stay in the file and are paged
+        in by the OS on demand, so start-up reads almost nothing and the pages
+        are shared between processes. Such an index is read-only; pass
+        ``mmap=False`` to load a copy that can be added to.
+        """
         p = Path(path)
         if not p.exists():
             raise FileNotFoundError(f"Index not found at {path}")
-        self.index = faiss.read_index(str(p))
+        self.index = None
+        if mmap:
+            try:
+                self.index = faiss.read_index(str(p), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                pass  # index type this FAISS build cannot map
+        self.read_only = self.index is not None
+        if self.index is None:
+            self.index = faiss.read_index(str(p))
+        self._apply_search_params()
 
     @property
     def size(self) -> int:
         return self.index.ntotal
+
+    @property
+    def is_flat(self) -> bool:
+        """True for exhaustive indexes, which have nothing to (re)train."""
+        try:
+            faiss.extract_index_ivf(self.index)
+        except RuntimeError:
+            return True
+        return False
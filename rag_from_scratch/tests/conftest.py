@@ -11,6 +11,13 @@ import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 
+@pytest.fixture(scope="session")
+def embedder():
+    """One embedder for the whole session; loading the model dominates test time."""
+    from embedding import Embedder
+    return Embedder()
+
+
 @pytest.fixture
 def sample_dataframe():
     """Create a sample DataFrame for testing."""
@@ -29,11 +36,9 @@ def sample_dataframe():
 
 @pytest.fixture
 def sample_embeddings():
-    """Create sample normalized embeddings for testing."""
+    """Create sample embeddings for testing (VectorStore.add normalizes them)."""
     dim = 384
-    vectors = np.random.random((5, dim)).astype('float32')
-    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-    return vectors / norms
+    return np.random.default_rng(0).random((5, dim), dtype=np.float32)
 
 
 @pytest.fixture
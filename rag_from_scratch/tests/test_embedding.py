@@ -4,17 +4,11 @@ Tests for the embedding module.
 import pytest
 import numpy as np
 
-from embedding import Embedder
 
 
 class TestEmbedder:
     """Tests for the Embedder class."""
     
-    @pytest.fixture(scope="class")
-    def embedder(self):
-        """Create a shared embedder instance (model loading is slow)."""
-        return Embedder()
-    
     def test_initialization(self, embedder):
         """Test that embedder initializes correctly."""
         assert embedder.model is not None
@@ -72,3 +66,15 @@ class TestEmbedder:
         
         similarity = np.dot(vectors[0], vectors[1])
         assert similarity < 0.5  # Unrelated texts should have lower similarity
+    
+    def test_query_embedding_cached(self, embedder, monkeypatch):
+        """Test that a repeated query is not passed through the model again."""
+        first = embedder.encode_queries(["Senior ML Engineer salary in Canada"])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("query embedding should have been cached")
+
+        monkeypatch.setattr(embedder, "encode", fail)
+        second = embedder.encode_queries(["Senior ML Engineer salary in Canada"])
+
+        np.testing.assert_array_equal(first, second)
@@ -76,6 +76,296 @@ class TestGeneratorInit:
             Generator(api_key=None)
 
 
+class TestBatchedGeneration:
+    """Tests for packing several questions into one Gemini request."""
+
+    @pytest.fixture
+    def gemini(self):
+        from unittest.mock import MagicMock
+        import generator as generator_module
+
+        gen = generator_module.GeminiGenerator.__new__(generator_module.GeminiGenerator)
+        gen.model = "test-model"
+        gen.gemini_model = MagicMock()
+        return gen
+
+    def test_one_request_per_batch(self, gemini):
+        from unittest.mock import MagicMock
+        gemini.gemini_model.generate_content.return_value = MagicMock(text='["a1", "a2"]')
+
+        answers = gemini.generate_answers(["q1", "q2", "q3"], [["c1"], ["c2"], []])
+
+        assert answers == ["a1", "a2", "I don't have enough data to answer that."]
+        assert gemini.gemini_model.generate_content.call_count == 1
+
+    def test_malformed_reply_falls_back_to_single_calls(self, gemini):
+        from unittest.mock import MagicMock
+        gemini.gemini_model.generate_content.side_effect = [
+            MagicMock(text="not json"), MagicMock(text="a1"), MagicMock(text="a2")
+        ]
+
+        assert gemini.generate_answers(["q1", "q2"], [["c1"], ["c2"]]) == ["a1", "a2"]
+        assert gemini.gemini_model.generate_content.call_count == 3
+
+
+class TestBatchJobs:
+    """Tests for the asynchronous Gemini batch-job helpers."""
+
+    @pytest.fixture
+    def gemini(self):
+        import generator as generator_module
+
+        gen = generator_module.GeminiGenerator.__new__(generator_module.GeminiGenerator)
+        gen.model = "test-model"
+        gen._api_key = "test-key"
+        return gen
+
+    def test_submit_sends_one_keyed_request_per_query(self, gemini, monkeypatch):
+        calls = []
+        monkeypatch.setattr(gemini, "_rest", lambda method, path, body=None: calls.append((method, path, body)) or {"name": "batches/1"})
+
+        assert gemini.submit_batch(["q1", "q2"], [["c1"], ["c2"]]) == "batches/1"
+        method, path, body = calls[0]
+        requests = body["batch"]["input_config"]["requests"]["requests"]
+        assert (method, path) == ("POST", "models/test-model:batchGenerateContent")
+        assert [r["metadata"]["key"] for r in requests] == ["0", "1"]
+
+    def test_poll_returns_none_while_running(self, gemini, monkeypatch):
+        monkeypatch.setattr(gemini, "_rest", lambda *a: {"metadata": {"state": "BATCH_STATE_RUNNING"}})
+        assert gemini.poll_batch("batches/1") is None
+
+    def test_poll_orders_answers_by_key(self, gemini, monkeypatch):
+        def answer(key, text):
+            return {"metadata": {"key": key}, "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}}
+
+        monkeypatch.setattr(gemini, "_rest", lambda *a: {
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "response": {"inlinedResponses": {"inlinedResponses": [answer("1", "a2"), answer("0", "a1")]}},
+        })
+        assert gemini.poll_batch("batches/1") == ["a1", "a2"]
+
+    def test_poll_keeps_positions_when_responses_are_missing(self, gemini, monkeypatch):
+        answer = {"metadata": {"key": "2"}, "response": {"candidates": [{"content": {"parts": [{"text": "a3"}]}}]}}
+        monkeypatch.setattr(gemini, "_rest", lambda *a: {
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED", "batchStats": {"requestCount": "4"}},
+            "response": {"inlinedResponses": {"inlinedResponses": [answer]}},
+        })
+        assert gemini.poll_batch("batches/1") == ["", "", "a3", ""]
+
+    def test_failed_batch_raises(self, gemini, monkeypatch):
+        monkeypatch.setattr(gemini, "_rest", lambda *a: {"metadata": {"state": "BATCH_STATE_FAILED"}})
+        with pytest.raises(GenerationError):
+            gemini.poll_batch("batches/1")
+
+
+class TestRetries:
+    """Tests for retrying transient LLM errors."""
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        self.sleeps = []
+        monkeypatch.setattr("generator.time.sleep", self.sleeps.append)
+
+    def test_rate_limit_is_retried(self):
+        from google.api_core.exceptions import ResourceExhausted
+        from generator import _call_with_retries
+        outcomes = [ResourceExhausted("quota"), ResourceExhausted("quota"), "ok"]
+
+        def call():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert _call_with_retries(call) == "ok"
+        assert len(self.sleeps) == 2
+
+    def test_retry_after_header_is_honored(self):
+        from generator import _retry_delay
+
+        class RateLimited(Exception):
+            status = 429
+            headers = {"Retry-After": "7"}
+
+        assert _retry_delay(RateLimited(), attempt=0) == 7.0
+
+    def test_permanent_errors_are_not_retried(self):
+        from generator import _call_with_retries
+
+        def call():
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            _call_with_retries(call)
+        assert self.sleeps == []
+
+    def test_http_client_errors_are_not_retried(self):
+        import urllib.error
+        from generator import _call_with_retries
+
+        def call():
+            raise urllib.error.HTTPError("https://example.invalid", 401, "Unauthorized", {}, None)
+
+        with pytest.raises(urllib.error.HTTPError):
+            _call_with_retries(call)
+        assert self.sleeps == []
+
+    def test_connection_errors_are_retried(self):
+        from generator import _retry_delay
+
+        assert _retry_delay(ConnectionResetError(), attempt=0) is not None
+        assert _retry_delay(TimeoutError(), attempt=0) is not None
+
+    def test_gives_up_after_max_retries(self):
+        from google.api_core.exceptions import ServiceUnavailable
+        from generator import _call_with_retries
+
+        def call():
+            raise ServiceUnavailable("down")
+
+        with pytest.raises(ServiceUnavailable):
+            _call_with_retries(call, max_retries=2)
+        assert len(self.sleeps) == 2
+
+
+class TestResponseCache:
+    """Tests for the exact-match response cache on the Generator facade."""
+
+    @pytest.fixture
+    def generator(self, monkeypatch):
+        import generator as generator_module
+
+        class FakeGemini(generator_module.GeminiGenerator):
+            def __init__(self, model, api_key, use_aio_transport=False):
+                self.model = model
+                self.calls = 0
+
+            def generate_answer(self, query, context_chunks, temperature=0):
+                self.calls += 1
+                return f"answer {self.calls}"
+
+        monkeypatch.setattr(generator_module, "GeminiGenerator", FakeGemini)
+        return Generator(api_key="test-key")
+
+    def test_repeat_call_is_served_from_cache(self, generator):
+        first = generator.generate_answer("q", ["ctx"])
+        second = generator.generate_answer("q", ["ctx"])
+
+        assert first == second == "answer 1"
+        assert generator._impl.calls == 1
+        assert (generator._cache.hits, generator._cache.misses) == (1, 1)
+
+    def test_different_context_misses(self, generator):
+        generator.generate_answer("q", ["ctx a"])
+        generator.generate_answer("q", ["ctx b"])
+        assert generator._impl.calls == 2
+
+    def test_sampled_answers_are_not_cached(self, generator):
+        generator.generate_answer("q", ["ctx"], temperature=0.7)
+        generator.generate_answer("q", ["ctx"], temperature=0.7)
+        assert generator._impl.calls == 2
+        assert len(generator._cache) == 0
+
+    def test_streamed_answer_is_cached(self, generator):
+        def stream(query, context_chunks, temperature=0):
+            generator._impl.calls += 1
+            yield from ["Data ", "Scientists ", "earn more. "]
+
+        generator._impl.stream_answer = stream
+
+        assert list(generator.stream_answer("q", ["ctx"])) == ["Data ", "Scientists ", "earn more. "]
+        assert list(generator.stream_answer("q", ["ctx"])) == ["Data Scientists earn more."]
+        assert generator._impl.calls == 1
+
+    def test_concurrent_duplicates_share_one_call(self, generator):
+        import asyncio
+
+        async def slow_answer(query, context_chunks, temperature=0):
+            generator._impl.calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        generator._impl.agenerate_answer = slow_answer
+
+        async def fan_out():
+            return await asyncio.gather(*(generator.agenerate_answer("q", ["ctx"]) for _ in range(5)))
+
+        assert asyncio.run(fan_out()) == ["answer"] * 5
+        assert generator._impl.calls == 1
+        assert generator._inflight == {}
+
+    def test_paraphrase_is_served_from_semantic_cache(self, monkeypatch, tmp_path):
+        import numpy as np
+        import generator as generator_module
+
+        class FakeGemini(generator_module.GeminiGenerator):
+            def __init__(self, model, api_key, use_aio_transport=False):
+                self.model = model
+                self.calls = 0
+
+            def generate_answer(self, query, context_chunks, temperature=0):
+                self.calls += 1
+                return "answer"
+
+        class FakeEmbedder:
+            dimension = 2
+
+            def encode_queries(self, queries):
+                # Every query maps to the same direction, i.e. a perfect paraphrase
+                return np.ones((len(queries), 2), dtype='float32')
+
+        monkeypatch.setattr(generator_module, "GeminiGenerator", FakeGemini)
+        gen = Generator(api_key="test-key", embedder=FakeEmbedder(), semantic_cache_path=tmp_path / "c.sqlite")
+
+        gen.generate_answer("How much does a Data Scientist earn?", ["ctx"])
+        assert gen.generate_answer("Data Scientist salary?", ["ctx"]) == "answer"
+        assert gen.generate_answer("Data Scientist salary?", ["other ctx"]) == "answer"
+        assert gen._impl.calls == 2
+
+
+class TestClientReuse:
+    """Tests for sharing the SDK client across generator instances."""
+
+    def test_sdk_is_configured_once_per_key(self, monkeypatch):
+        import generator as generator_module
+        calls = []
+        monkeypatch.setattr(generator_module, "_configured_api_key", None)
+        monkeypatch.setattr(generator_module.genai, "configure", lambda api_key: calls.append(api_key))
+
+        Generator(api_key="key-a")
+        Generator(api_key="key-a")
+        Generator(api_key="key-b")
+
+        assert calls == ["key-a", "key-b"]
+
+    def test_warm_up_counts_tokens_and_ignores_errors(self, monkeypatch):
+        gen = Generator(api_key="test-key")
+        calls = []
+
+        def offline(text):
+            calls.append(text)
+            raise RuntimeError("offline")
+        monkeypatch.setattr(gen._impl.gemini_model, "count_tokens", offline)
+
+        gen.warm_up()
+        assert len(calls) == 1
+
+    def test_aio_session_is_closed_with_its_event_loop(self):
+        pytest.importorskip("aiohttp")
+        import asyncio
+        import generator as generator_module
+
+        async def session():
+            first = generator_module._get_session()
+            assert generator_module._get_session() is first
+            return first
+
+        sessions = [asyncio.run(session()) for _ in range(2)]
+
+        assert sessions[0] is not sessions[1]
+        assert all(s.closed for s in sessions)
+
+
 class TestGenerationError:
     """Tests for the GenerationError exception."""
 
@@ -85,3 +375,45 @@ class TestGenerationError:
     def test_message(self):
         err = GenerationError("test failure")
         assert "test failure" in str(err)
+
+
+class TestAsyncGeneration:
+    """Tests for the async batch entrypoint."""
+
+    def test_agenerate_answers_preserves_order(self):
+        """Test that batched answers come back in query order."""
+        import asyncio
+        advisor = LocalAdvisor()
+        answers = asyncio.run(advisor.agenerate_answers(
+            ["q1", "q2", "q3"], [["Chunk A"], [], ["Chunk C"]], concurrency=2
+        ))
+
+        assert len(answers) == 3
+        assert "Chunk A" in answers[0]
+        assert "don't have enough data" in answers[1].lower()
+        assert "Chunk C" in answers[2]
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than `concurrency` requests run at once."""
+        import asyncio
+
+        class SlowGenerator(BaseGenerator):
+            def __init__(self):
+                self.active = 0
+                self.peak = 0
+
+            def generate_answer(self, query, context_chunks, **kwargs):
+                return query
+
+            async def agenerate_answer(self, query, context_chunks, **kwargs):
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(0.01)
+                self.active -= 1
+                return query
+
+        gen = SlowGenerator()
+        answers = asyncio.run(gen.agenerate_answers([str(i) for i in range(10)], [[]] * 10, concurrency=3))
+
+        assert answers == [str(i) for i in range(10)]
+        assert gen.peak == 3
@@ -4,7 +4,7 @@ Tests for the ingestion module.
 import pytest
 import pandas as pd
 
-from ingestion import clean_data
+from ingestion import clean_data, save_processed_data, load_processed_data, run_ingestion, ingest_streaming
 from chunks import create_text_chunks
 from config import EXPERIENCE_MAPPING, EMPLOYMENT_MAPPING, COMPANY_SIZE_MAPPING
 
@@ -21,6 +21,16 @@ class TestCleanData:
         cleaned = clean_data(df_with_dups)
         assert len(cleaned) == 3  # Duplicates removed
     
+    def test_clean_data_uses_hash_dedup(self, sample_dataframe, monkeypatch):
+        """Test that duplicates are dropped by hashing, not by a groupby."""
+        def no_groupby(*args, **kwargs):
+            raise AssertionError("clean_data should deduplicate with drop_duplicates")
+        monkeypatch.setattr(pd.DataFrame, "groupby", no_groupby)
+        
+        cleaned = clean_data(pd.concat([sample_dataframe, sample_dataframe.iloc[[0]]]))
+        assert len(cleaned) == 3
+        assert cleaned.index.equals(pd.RangeIndex(3))
+    
     def test_maps_experience_levels(self, sample_dataframe):
         """Test that experience level codes are mapped to full names."""
         cleaned = clean_data(sample_dataframe)
@@ -56,6 +66,21 @@ class TestCleanData:
         assert cleaned.loc[0, 'experience_level'] == 'UNKNOWN'
         assert cleaned.loc[0, 'employment_type'] == 'XX'
 
+    
+    def test_mapped_columns_are_categorical(self, sample_dataframe):
+        """Test that coded columns become compact categoricals."""
+        cleaned = clean_data(sample_dataframe)
+        
+        assert isinstance(cleaned['experience_level'].dtype, pd.CategoricalDtype)
+        assert cleaned['company_size'].tolist() == ['medium', 'large', 'small']
+    
+    def test_code_and_label_mixed(self):
+        """Test that a column already containing some labels still maps its codes."""
+        df = pd.DataFrame({'experience_level': ['SE', 'Senior-level', 'EN']})
+        cleaned = clean_data(df)
+        
+        assert cleaned['experience_level'].tolist() == ['Senior-level', 'Senior-level', 'Entry-level']
+
 
 class TestCreateTextChunks:
     """Tests for the create_text_chunks function."""
@@ -90,3 +115,70 @@ class TestCreateTextChunks:
         assert 'remote' in chunked.loc[0, 'text_chunk'].lower()
         assert 'hybrid' in chunked.loc[1, 'text_chunk'].lower()
         assert 'on-site' in chunked.loc[2, 'text_chunk'].lower()
+    
+    def test_missing_values_use_defaults(self, sample_dataframe):
+        """Test that missing fields fall back to defaults instead of rendering 'nan'."""
+        sample_dataframe.loc[0, 'job_title'] = None
+        chunked = create_text_chunks(clean_data(sample_dataframe).drop(columns=['company_location']))
+        
+        text = chunked.loc[0, 'text_chunk']
+        assert 'nan' not in text
+        assert 'Senior-level professional' in text
+        assert text.endswith('located in unknown location.')
+    
+    def test_custom_chunk_fn(self, sample_dataframe):
+        """Test that a custom per-row chunk function is still supported."""
+        chunked = create_text_chunks(sample_dataframe, chunk_fn=lambda row: row['job_title'].upper())
+        
+        assert chunked['text_chunk'].tolist() == ['DATA SCIENTIST', 'ML ENGINEER', 'DATA ANALYST']
+
+
+    def test_identical_chunks_are_merged(self, sample_dataframe):
+        """Test that rows serializing to the same text are embedded once, with a row count."""
+        df = pd.concat([sample_dataframe, sample_dataframe.iloc[[0]]], ignore_index=True)
+        chunked = create_text_chunks(df)
+        
+        assert len(chunked) == 3
+        assert chunked['row_count'].tolist() == [2, 1, 1]
+        assert len(create_text_chunks(df, dedupe=False)) == 4
+
+    def test_missing_chunks_are_merged(self, sample_dataframe):
+        """Test that a chunk_fn returning None for some rows does not break dedup."""
+        texts = iter(["a", None, "a"])
+        chunked = create_text_chunks(sample_dataframe, chunk_fn=lambda row: next(texts))
+
+        assert chunked["row_count"].tolist() == [2, 1]
+        assert chunked["text_chunk"].iloc[0] == "a"
+        assert chunked["text_chunk"].isna().iloc[1]
+
+
+class TestProcessedDataIO:
+    """Tests for saving and reloading processed data."""
+    
+    @pytest.mark.parametrize("filename", ["cleaned.parquet", "cleaned.csv"])
+    def test_round_trip(self, sample_dataframe, tmp_path, filename):
+        """Test that processed data survives a save/load round trip in both formats."""
+        chunked = create_text_chunks(clean_data(sample_dataframe))
+        path = save_processed_data(chunked, str(tmp_path / filename))
+        loaded = load_processed_data(path)
+        
+        assert loaded['text_chunk'].tolist() == chunked['text_chunk'].tolist()
+        assert loaded['salary_in_usd'].tolist() == [150000, 120000, 80000]
+
+
+class TestStreamingIngestion:
+    """Tests for block-by-block ingestion of large raw files."""
+
+    @pytest.mark.parametrize("filename", ["cleaned.parquet", "cleaned.csv"])
+    def test_matches_in_memory_ingestion(self, sample_dataframe, tmp_path, filename):
+        """Test that streaming, with duplicates spread across blocks, gives the same output."""
+        raw = pd.concat([sample_dataframe] * 200, ignore_index=True)
+        raw_path = tmp_path / "raw.csv"
+        raw.to_csv(raw_path, index=False)
+
+        in_memory = run_ingestion(str(raw_path), str(tmp_path / f"full_{filename}"), streaming=False)
+        written = ingest_streaming(str(raw_path), str(tmp_path / filename), block_size=1024)
+        streamed = load_processed_data(str(tmp_path / filename))
+
+        assert written == len(in_memory) == 3
+        assert streamed['text_chunk'].tolist() == in_memory['text_chunk'].tolist()
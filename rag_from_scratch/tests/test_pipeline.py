@@ -2,17 +2,17 @@
 Tests for the pipeline module.
 """
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 import pandas as pd
 
 from pipeline import RAGPipeline
 from generator import GenerationError, LocalAdvisor
-from embedding import Embedder
+from retriever import Retriever
 from vector_store import VectorStore
 
 
 @pytest.fixture(scope="module")
-def pipeline_components():
+def pipeline_components(embedder):
     """Build real embedder + store with sample data for integration tests."""
     chunks = [
         "In 2024, a Senior-level Data Scientist in US earned 150,000 USD.",
@@ -22,31 +22,58 @@ def pipeline_components():
         "In 2023, a Mid-level AI Researcher in US earned 160,000 USD.",
     ]
     df = pd.DataFrame({"text_chunk": chunks})
-    embedder = Embedder()
     store = VectorStore(dimension=embedder.dimension)
     vectors = embedder.encode(chunks)
     store.add(vectors)
     return embedder, store, df
 
 
+@pytest.fixture(scope="module")
+def shared_retriever(pipeline_components):
+    """One Retriever over the sample data, shared by every pipeline test."""
+    embedder, store, df = pipeline_components
+    return Retriever(embedder, store, df)
+
+
+@pytest.fixture
+def mocked_pipeline(shared_retriever):
+    """A pipeline wired to the shared retriever and a fresh mock generator."""
+    mock_gen = MagicMock()
+    pipeline = RAGPipeline.from_components(shared_retriever, mock_gen, model="test-model")
+    return pipeline, mock_gen
+
+
+class TestFromComponents:
+    """Tests for RAGPipeline.from_components()."""
+
+    def test_rejects_mismatched_dimensions(self):
+        """Test that an embedder and index of different widths are refused."""
+        retriever = MagicMock()
+        retriever.embedder.dimension = 384
+        retriever.vector_store.dimension = 768
+
+        with pytest.raises(ValueError, match="dimension"):
+            RAGPipeline.from_components(retriever, MagicMock())
+
+    def test_defaults_to_local_fallback(self):
+        """Test that the LocalAdvisor fallback is created when none is given."""
+        retriever = MagicMock()
+        retriever.embedder.dimension = retriever.vector_store.dimension = 384
+
+        pipeline = RAGPipeline.from_components(retriever, MagicMock())
+
+        assert isinstance(pipeline.fallback, LocalAdvisor)
+
+
 class TestRAGPipelineRun:
     """Tests for the RAGPipeline.run() method."""
 
-    def test_run_returns_expected_keys(self, pipeline_components):
+    def test_run_returns_expected_keys(self, mocked_pipeline):
         """Test that run() returns the correct response structure."""
-        embedder, store, df = pipeline_components
-
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-            mock_gen.generate_answer.return_value = "The salary is $150,000."
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.generate_answer.return_value = "The salary is $150,000."
 
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            pipeline.retriever = __import__("retriever").Retriever(embedder, store, df)
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
-
-            result = pipeline.run("Data Scientist salary")
+        result = pipeline.run("Data Scientist salary")
 
         assert "query" in result
         assert "answer" in result
@@ -54,83 +81,99 @@ class TestRAGPipelineRun:
         assert "scores" in result
         assert "source" in result
 
-    def test_run_uses_fallback_on_generation_error(self, pipeline_components):
+    def test_run_uses_fallback_on_generation_error(self, mocked_pipeline):
         """Test that the fallback is used when the generator raises."""
-        embedder, store, df = pipeline_components
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.generate_answer.side_effect = GenerationError("API down")
 
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-            mock_gen.generate_answer.side_effect = GenerationError("API down")
-
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            pipeline.retriever = __import__("retriever").Retriever(embedder, store, df)
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
-
-            result = pipeline.run("Data Scientist salary", use_fallback=True)
+        result = pipeline.run("Data Scientist salary", use_fallback=True)
 
         assert result["source"] == "fallback"
         assert "LocalAdvisor" in result["answer"]
 
-    def test_run_raises_when_fallback_disabled(self, pipeline_components):
+    def test_run_raises_when_fallback_disabled(self, mocked_pipeline):
         """Test that GenerationError propagates when fallback is disabled."""
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.generate_answer.side_effect = GenerationError("API down")
+
+        with pytest.raises(GenerationError):
+            pipeline.run("Data Scientist salary", use_fallback=False)
+
+    def test_fallback_does_not_re_encode(self, mocked_pipeline, pipeline_components, monkeypatch):
+        """Test that the fallback answers from the chunks already retrieved."""
+        from collections import OrderedDict
+
+        pipeline, mock_gen = mocked_pipeline
         embedder, store, df = pipeline_components
+        encoded = []
+        real_encode = embedder.encode
 
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-            mock_gen.generate_answer.side_effect = GenerationError("API down")
+        def counting_encode(texts, *args, **kwargs):
+            encoded.append(list(texts))
+            return real_encode(texts, *args, **kwargs)
 
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            pipeline.retriever = __import__("retriever").Retriever(embedder, store, df)
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
+        # Start from empty query and result caches so the model call is observable
+        monkeypatch.setattr(embedder, "_query_cache", OrderedDict())
+        monkeypatch.setattr(embedder, "encode", counting_encode)
+        pipeline.retriever = Retriever(embedder, store, df)
+        pipeline.fallback = MagicMock(wraps=LocalAdvisor())
+        mock_gen.generate_answer.side_effect = GenerationError("API down")
 
-            with pytest.raises(GenerationError):
-                pipeline.run("Data Scientist salary", use_fallback=False)
+        result = pipeline.run("ML Engineer pay in the US", use_fallback=True)
 
-    def test_run_returns_no_results(self, pipeline_components):
+        assert encoded == [["ML Engineer pay in the US"]]
+        pipeline.fallback.generate_answer.assert_called_once_with(
+            "ML Engineer pay in the US", result["context"]
+        )
+
+    def test_run_returns_no_results(self, mocked_pipeline, pipeline_components):
         """Test that a completely irrelevant query returns the no_results response."""
+        pipeline, mock_gen = mocked_pipeline
         embedder, store, df = pipeline_components
+        # Use a retriever with a very high threshold to force no results
+        pipeline.retriever = Retriever(embedder, store, df, min_score=0.99)
 
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            # Use a retriever with a very high threshold to force no results
-            retriever = __import__("retriever").Retriever(
-                embedder, store, df, min_score=0.99
-            )
-            pipeline.retriever = retriever
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
-
-            result = pipeline.run("xyzzy foobar nonsense gibberish")
+        result = pipeline.run("xyzzy foobar nonsense gibberish")
 
         assert result["source"] == "no_results"
         assert len(result["context"]) == 0
+        mock_gen.generate_answer.assert_not_called()
+
+
+class TestRAGPipelineStream:
+    """Tests for the RAGPipeline.run_stream() method."""
+
+    def test_stream_yields_generator_pieces(self, mocked_pipeline):
+        """Test that the answer is streamed piece by piece from the generator."""
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.stream_answer.return_value = iter(["The salary ", "is $150,000."])
+
+        result = pipeline.run_stream("Data Scientist salary")
+
+        assert list(result["answer"]) == ["The salary ", "is $150,000."]
+        assert result["source"] == "llm"
+        assert len(result["context"]) > 0
+
+    def test_stream_falls_back_when_stream_fails_to_open(self, mocked_pipeline):
+        """Test that a stream failing before any text falls back to LocalAdvisor."""
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.stream_answer.side_effect = GenerationError("API down")
+
+        result = pipeline.run_stream("Data Scientist salary")
+
+        assert "LocalAdvisor" in "".join(result["answer"])
+        assert result["source"] == "fallback"
 
 
 class TestSalaryInsight:
     """Tests for the get_salary_insight() method."""
 
-    def test_insight_uses_retriever_not_run(self, pipeline_components):
+    def test_insight_uses_retriever_not_run(self, mocked_pipeline):
         """Verify that get_salary_insight calls retriever.search, not self.run."""
-        embedder, store, df = pipeline_components
-
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-            mock_gen.generate_answer.return_value = "Insight report text."
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.generate_answer.return_value = "Insight report text."
 
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            pipeline.retriever = __import__("retriever").Retriever(embedder, store, df)
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
-
-            result = pipeline.get_salary_insight("Data Scientist")
+        result = pipeline.get_salary_insight("Data Scientist")
 
         assert "job_title" in result
         assert "report" in result
@@ -138,21 +181,25 @@ class TestSalaryInsight:
         # The generator should only be called ONCE (for the insight), not twice
         assert mock_gen.generate_answer.call_count == 1
 
-    def test_insight_fallback_on_error(self, pipeline_components):
+    def test_insight_fallback_on_error(self, mocked_pipeline):
         """Test that insight falls back to local report on GenerationError."""
-        embedder, store, df = pipeline_components
+        pipeline, mock_gen = mocked_pipeline
+        mock_gen.generate_answer.side_effect = GenerationError("quota")
 
-        with patch("pipeline.Generator") as MockGen:
-            mock_gen = MockGen.return_value
-            mock_gen.generate_answer.side_effect = GenerationError("quota")
-
-            pipeline = RAGPipeline.__new__(RAGPipeline)
-            pipeline.retriever = __import__("retriever").Retriever(embedder, store, df)
-            pipeline.generator = mock_gen
-            pipeline.fallback = LocalAdvisor()
-            pipeline.model = "test-model"
-
-            result = pipeline.get_salary_insight("Data Scientist")
+        result = pipeline.get_salary_insight("Data Scientist")
 
         assert "Career Insight Report" in result["report"]
         assert "local report" in result["report"].lower()
+
+    def test_local_insight_summarizes_salaries(self, mocked_pipeline):
+        """Test that the local report includes salary statistics when available."""
+        import numpy as np
+
+        pipeline, _ = mocked_pipeline
+        report = pipeline._generate_local_insight(
+            "Data Scientist", ["chunk"], np.array([100000.0, np.nan, 200000.0])
+        )
+
+        assert "Min 100,000" in report
+        assert "Max 200,000" in report
+        assert "Average 150,000" in report
@@ -6,18 +6,15 @@ import pandas as pd
 import numpy as np
 
 from retriever import Retriever
-from embedding import Embedder
 from vector_store import VectorStore
 
 
 class TestRetriever:
     """Tests for the Retriever class."""
     
-    @pytest.fixture(scope="class")
-    def setup_retriever(self, sample_text_chunks):
+    @pytest.fixture
+    def setup_retriever(self, embedder, sample_text_chunks):
         """Create a retriever with sample data."""
-        embedder = Embedder()
-        
         # Create embeddings for sample chunks
         vectors = embedder.encode(sample_text_chunks)
         
@@ -30,9 +27,9 @@ class TestRetriever:
         
         return Retriever(embedder, store, df)
     
-    @pytest.fixture
-    def retriever_with_data(self):
-        """Create a fresh retriever for each test."""
+    @pytest.fixture(scope="class")
+    def retriever_with_data(self, embedder):
+        """Create one retriever for the class; tests must not modify it."""
         chunks = [
             "Data Scientist in New York earns $150,000 USD.",
             "Machine Learning Engineer in San Francisco earns $180,000 USD.",
@@ -41,7 +38,6 @@ class TestRetriever:
             "Entry-level Data Scientist earns $90,000 USD."
         ]
         
-        embedder = Embedder()
         vectors = embedder.encode(chunks)
         
         store = VectorStore(dimension=embedder.dimension)
@@ -100,3 +96,37 @@ class TestRetriever:
         
         # Should return at most 5 (number of documents)
         assert len(results) <= 5
+    
+    def test_search_many_matches_single_search(self, retriever_with_data):
+        """Test that batched search returns the same results as one search per query."""
+        queries = ["Data Scientist salary", "Machine Learning Engineer"]
+        batched = retriever_with_data.search_many(queries, k=3)
+        
+        assert len(batched) == len(queries)
+        for query, results in zip(queries, batched):
+            single = retriever_with_data.search(query, k=3)
+            assert [r['index'] for r in results] == [r['index'] for r in single]
+    
+    def test_repeated_query_skips_encoding(self, retriever_with_data, monkeypatch):
+        """Test that a repeated query is answered from the results cache."""
+        first = retriever_with_data.search("Data Engineer salary", k=2)
+        
+        def fail(queries):
+            raise AssertionError("query should have been cached")
+        monkeypatch.setattr(retriever_with_data.embedder, "encode_queries", fail)
+        
+        assert retriever_with_data.search("Data Engineer salary", k=2) == first
+    
+    def test_search_with_metadata_does_not_alter_cached_results(self, retriever_with_data):
+        """Test that metadata columns are attached to copies of the search results."""
+        retriever = Retriever(
+            retriever_with_data.embedder,
+            retriever_with_data.vector_store,
+            retriever_with_data.data.assign(city=["NY", "SF", "CHI", "SEA", "NY"])
+        )
+        
+        with_meta = retriever.search_with_metadata("Data Analyst", k=1, metadata_columns=['city'])
+        plain = retriever.search("Data Analyst", k=1)
+        
+        assert with_meta[0]['city'] == ["NY", "SF", "CHI", "SEA", "NY"][with_meta[0]['index']]
+        assert 'city' not in plain[0]
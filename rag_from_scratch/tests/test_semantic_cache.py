@@ -0,0 +1,83 @@
+"""
+Tests for the semantic answer cache.
+"""
+import numpy as np
+import pytest
+
+from semantic_cache import SemanticCache, context_hash
+
+
+def _unit(vec):
+    vec = np.asarray(vec, dtype='float32')
+    return vec / np.linalg.norm(vec)
+
+
+class TestSemanticCache:
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticCache(dimension=4, namespace="test", threshold=0.9)
+
+    def test_empty_cache_misses(self, cache):
+        assert cache.get(_unit([1, 0, 0, 0]), "ctx") is None
+        assert cache.misses == 1
+
+    def test_similar_query_with_same_context_hits(self, cache):
+        cache.put(_unit([1, 0, 0, 0]), "ctx", "answer")
+        assert cache.get(_unit([1, 0.1, 0, 0]), "ctx") == "answer"
+        assert cache.hits == 1
+
+    def test_dissimilar_query_misses(self, cache):
+        cache.put(_unit([1, 0, 0, 0]), "ctx", "answer")
+        assert cache.get(_unit([0, 1, 0, 0]), "ctx") is None
+
+    def test_different_context_misses(self, cache):
+        cache.put(_unit([1, 0, 0, 0]), "ctx a", "answer")
+        assert cache.get(_unit([1, 0, 0, 0]), "ctx b") is None
+
+    def test_entries_persist_across_instances(self, tmp_path):
+        db_path = tmp_path / "cache.sqlite"
+        SemanticCache(4, "test", db_path=db_path).put(_unit([1, 0, 0, 0]), "ctx", "answer")
+
+        reloaded = SemanticCache(4, "test", db_path=db_path)
+        assert len(reloaded) == 1
+        assert reloaded.get(_unit([1, 0, 0, 0]), "ctx") == "answer"
+        assert len(SemanticCache(4, "other", db_path=db_path)) == 0
+
+    def test_match_below_nearest_neighbour_hits(self, cache):
+        cache.put(_unit([1, 0.05, 0, 0]), "ctx a", "answer a")
+        cache.put(_unit([1, 0.2, 0, 0]), "ctx b", "answer b")
+        # The nearest entry was grounded on ctx a; the ctx b one at rank 2 still qualifies
+        assert cache.get(_unit([1, 0, 0, 0]), "ctx b") == "answer b"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SemanticCache(dimension=4, namespace="test", threshold=0.9, max_entries=2)
+        cache.put(_unit([1, 0, 0, 0]), "ctx", "first")
+        cache.put(_unit([0, 1, 0, 0]), "ctx", "second")
+        assert cache.get(_unit([1, 0, 0, 0]), "ctx") == "first"
+        cache.put(_unit([0, 0, 1, 0]), "ctx", "third")
+
+        assert len(cache) == 2
+        assert cache.get(_unit([0, 1, 0, 0]), "ctx") is None
+        assert cache.get(_unit([1, 0, 0, 0]), "ctx") == "first"
+        assert cache.get(_unit([0, 0, 1, 0]), "ctx") == "third"
+
+    def test_persisted_entries_are_capped(self, tmp_path):
+        import sqlite3
+        db_path = tmp_path / "cache.sqlite"
+        cache = SemanticCache(4, "test", db_path=db_path, max_entries=2)
+        for i in range(3):
+            cache.put(_unit(np.eye(4)[i]), "ctx", f"answer {i}")
+
+        reloaded = SemanticCache(4, "test", db_path=db_path, max_entries=1)
+        assert len(reloaded) == 1
+        assert reloaded.get(_unit([0, 0, 1, 0]), "ctx") == "answer 2"
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0] == 1
+
+
+class TestContextHash:
+
+    def test_is_order_sensitive_and_stable(self):
+        assert context_hash(["a", "b"]) == context_hash(["a", "b"])
+        assert context_hash(["a", "b"]) != context_hash(["b", "a"])
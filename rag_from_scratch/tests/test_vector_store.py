@@ -6,7 +6,7 @@ import tempfile
 import pytest
 import numpy as np
 
-from vector_store import VectorStore
+from vector_store import VectorStore, choose_index_factory
 
 
 class TestVectorStore:
@@ -29,7 +29,7 @@ class TestVectorStore:
     def test_add_wrong_dimension_raises(self):
         """Test that adding vectors with wrong dimension raises ValueError."""
         store = VectorStore(dimension=384)
-        wrong_dim_vectors = np.random.random((3, 256)).astype('float32')
+        wrong_dim_vectors = np.random.default_rng(0).random((3, 256), dtype=np.float32)
         
         with pytest.raises(ValueError, match="dimension mismatch"):
             store.add(wrong_dim_vectors)
@@ -88,10 +88,122 @@ class TestVectorStore:
         store = VectorStore(dimension=384)
         
         # Create float64 vectors
-        vectors = np.random.random((3, 384)).astype('float64')
+        vectors = np.random.default_rng(0).random((3, 384))
         norms = np.linalg.norm(vectors, axis=1, keepdims=True)
         normalized = (vectors / norms).astype('float64')  # Still float64
         
         # Should handle conversion internally
         store.add(normalized)
         assert store.size == 3
+
+
+class TestCompressedIndex:
+    """Tests for factory-built (trained) indexes."""
+
+    @pytest.fixture
+    def corpus(self):
+        vectors = np.random.default_rng(0).standard_normal((2000, 64), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def test_ivf_index_is_trained_on_add(self, corpus):
+        store = VectorStore(dimension=64, index_factory="IVF16,Flat", nprobe=16)
+        store.add(corpus)
+
+        assert store.size == 2000
+        scores, indices = store.search(corpus[:3], k=1)
+        assert indices[:, 0].tolist() == [0, 1, 2]
+
+    def test_nprobe_survives_save_and_load(self, corpus, tmp_path):
+        import faiss
+        store = VectorStore(dimension=64, index_factory="IVF16,Flat", nprobe=4)
+        store.add(corpus)
+        store.save(str(tmp_path / "ivf.bin"))
+
+        loaded = VectorStore(dimension=64, nprobe=4)
+        loaded.load(str(tmp_path / "ivf.bin"))
+        assert faiss.extract_index_ivf(loaded.index).nprobe == 4
+
+    def test_mmap_load_matches_in_memory_load(self, corpus, tmp_path):
+        store = VectorStore(dimension=64, index_factory="IVF16,Flat", nprobe=4)
+        store.add(corpus)
+        store.save(str(tmp_path / "ivf.bin"))
+
+        mapped = VectorStore(dimension=64, nprobe=4)
+        mapped.load(str(tmp_path / "ivf.bin"))
+        copied = VectorStore(dimension=64, nprobe=4)
+        copied.load(str(tmp_path / "ivf.bin"), mmap=False)
+
+        assert mapped.size == copied.size == 2000
+        np.testing.assert_array_equal(mapped.search(corpus[:5], k=3)[1], copied.search(corpus[:5], k=3)[1])
+
+        with pytest.raises(RuntimeError, match="mmap=False"):
+            mapped.add(corpus[:1])
+        copied.add(corpus[:1])
+        assert copied.size == 2001
+
+    def test_nprobe_can_be_raised_per_search(self, corpus):
+        exact = VectorStore(dimension=64)
+        exact.add(corpus)
+        store = VectorStore(dimension=64, index_factory="IVF16,Flat", nprobe=1)
+        store.add(corpus)
+
+        queries = corpus[:20] + 0.5 * np.random.default_rng(1).standard_normal((20, 64), dtype=np.float32)
+        # Scanning every list makes the IVF search exhaustive
+        np.testing.assert_array_equal(store.search(queries, k=5, nprobe=16)[1], exact.search(queries, k=5)[1])
+        import faiss
+        assert faiss.extract_index_ivf(store.index).nprobe == 1
+
+    def test_reset_keeps_training(self, corpus):
+        store = VectorStore(dimension=64, index_factory="IVF16,Flat", nprobe=16)
+        store.add(corpus)
+        store.reset()
+
+        assert store.size == 0
+        assert store.index.is_trained
+        assert not store.is_flat
+        store.add(corpus[:10])
+        assert store.search(corpus[:1], k=1)[1][0, 0] == 0
+
+    def test_hnsw_index_applies_ef_search(self, corpus, tmp_path):
+        import faiss
+        store = VectorStore(dimension=64, index_factory="HNSW32,Flat", ef_search=48)
+        store.add(corpus)
+        assert store.search(corpus[:3], k=1)[1][:, 0].tolist() == [0, 1, 2]
+
+        store.save(str(tmp_path / "hnsw.bin"))
+        loaded = VectorStore(dimension=64, ef_search=48)
+        loaded.load(str(tmp_path / "hnsw.bin"))
+        assert faiss.downcast_index(loaded.index).hnsw.efSearch == 48
+
+    def test_int8_index_is_trained_on_add(self, corpus):
+        store = VectorStore(dimension=64, index_factory="SQ8")
+        store.add(corpus)
+
+        assert store.index.is_trained
+        assert store.search(corpus[:3], k=1)[1][:, 0].tolist() == [0, 1, 2]
+
+    def test_search_accepts_strided_queries(self, sample_embeddings):
+        store = VectorStore(dimension=384)
+        store.add(sample_embeddings)
+
+        queries = np.asfortranarray(sample_embeddings[::2])
+        _, indices = store.search(queries, k=1)
+        assert indices[:, 0].tolist() == [0, 2, 4]
+
+    def test_search_rejects_1d_query(self, sample_embeddings):
+        store = VectorStore(dimension=384)
+        store.add(sample_embeddings)
+
+        with pytest.raises(ValueError, match="dimension mismatch"):
+            store.search(sample_embeddings[0], k=1)
+
+    def test_add_normalizes_vectors(self):
+        store = VectorStore(dimension=4)
+        store.add(np.array([[3.0, 4.0, 0.0, 0.0]], dtype=np.float32))
+
+        scores, _ = store.search(np.array([[0.6, 0.8, 0.0, 0.0]], dtype=np.float32), k=1)
+        assert scores[0, 0] == pytest.approx(1.0, abs=1e-3)
+
+    def test_small_corpora_stay_flat(self):
+        assert choose_index_factory(100) is None
+        assert choose_index_factory(1_000_000) == "IVF4096_HNSW32,PQ32"